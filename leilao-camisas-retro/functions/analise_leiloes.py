@@ -0,0 +1,319 @@
+"""
+Análise de Leilões com NumPy
+Calcula estatísticas por camisa (preço final, quantidade de lances, curva de
+crescimento do preço, lances por minuto e usuários únicos) sobre os lances
+armazenados (histórico arquivado e camada quente), usando colunas NumPy e
+operações vetorizadas (lexsort/reduceat) no lugar de loops Python.
+
+NumPy é opcional para o restante do sistema e só é exigido por este módulo.
+
+Benchmark contra o agrupamento em Python puro:
+    python -m functions.analise_leiloes --lances 200000
+"""
+
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+from functions.processar_lance import banco_lances
+from functions.arquivar_leiloes import consultar_arquivo
+
+MICROSSEGUNDOS_POR_MINUTO = 60 * 1000000
+
+
+def _exigir_numpy():
+    """Garante que o NumPy está disponível antes de qualquer análise."""
+    if np is None:
+        raise ImportError("NumPy e necessario para a analise de leiloes: pip install numpy")
+
+
+def lances_armazenados(diretorio=None):
+    """
+    Percorre todos os lances armazenados: o histórico arquivado e depois a
+    camada quente. Os leilões encerrados só existem no arquivo.
+
+    Args:
+        diretorio: Diretório dos segmentos (padrão: DIRETORIO_ARQUIVO)
+
+    Returns:
+        iterator: Lances, sem materializar listas
+    """
+    return itertools.chain(consultar_arquivo(diretorio=diretorio), banco_lances)
+
+
+def carregar_colunas(lances=None):
+    """
+    Carrega os lances em colunas NumPy.
+
+    Camisas e usuários viram códigos inteiros (índices em 'camisas' e
+    'usuarios'), valores viram centavos inteiros e os horários viram
+    microssegundos desde a época.
+
+    Args:
+        lances: Iterável de lances (padrão: lances_armazenados())
+
+    Returns:
+        dict: Colunas 'camisa', 'usuario', 'centavos', 'epoch_us' e os
+              vocabulários 'camisas' e 'usuarios'
+    """
+    _exigir_numpy()
+    if lances is None:
+        lances = lances_armazenados()
+
+    codigos_camisa = {}
+    codigos_usuario = {}
+    camisa = []
+    usuario = []
+    valores = []
+    timestamps = []
+
+    # Única passada em Python: só traduz os campos para listas planas
+    for lance in lances:
+        camisa.append(codigos_camisa.setdefault(lance['camisa_id'], len(codigos_camisa)))
+        usuario.append(codigos_usuario.setdefault(lance['nome_usuario'], len(codigos_usuario)))
+        valores.append(lance['valor_do_lance'])
+        timestamps.append(lance['timestamp'])
+
+    return {
+        'camisas': np.array(list(codigos_camisa), dtype=object),
+        'usuarios': np.array(list(codigos_usuario), dtype=object),
+        'camisa': np.array(camisa, dtype=np.int32),
+        'usuario': np.array(usuario, dtype=np.int32),
+        'centavos': np.rint(np.array(valores, dtype=np.float64) * 100).astype(np.int64),
+        'epoch_us': np.array(timestamps, dtype='datetime64[us]').astype(np.int64)
+    }
+
+
+def _inicios_dos_grupos(chave_ordenada):
+    """Posições onde cada grupo começa em uma chave já ordenada."""
+    if len(chave_ordenada) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.concatenate(([0], np.flatnonzero(np.diff(chave_ordenada)) + 1))
+
+
+def estatisticas_por_camisa(colunas):
+    """
+    Calcula as estatísticas agregadas de cada camisa de forma vetorizada.
+
+    Os lances são ordenados por (camisa, horário) com lexsort e cada
+    agregado sai de um reduceat sobre os inícios dos grupos.
+
+    Args:
+        colunas: Resultado de carregar_colunas()
+
+    Returns:
+        dict: Colunas por camisa: 'camisa_id', 'quantidade_lances',
+              'preco_inicial_centavos', 'preco_final_centavos', 'vencedor',
+              'primeiro_lance_us', 'ultimo_lance_us', 'lances_por_minuto'
+              e 'usuarios_unicos'
+    """
+    _exigir_numpy()
+    ordem = np.lexsort((colunas['epoch_us'], colunas['camisa']))
+    camisa = colunas['camisa'][ordem]
+    centavos = colunas['centavos'][ordem]
+    epoch_us = colunas['epoch_us'][ordem]
+    usuario = colunas['usuario'][ordem]
+
+    inicios = _inicios_dos_grupos(camisa)
+    if len(inicios) == 0:
+        vazio = np.zeros(0, dtype=np.int64)
+        return {
+            'camisa_id': np.zeros(0, dtype=object), 'quantidade_lances': vazio,
+            'preco_inicial_centavos': vazio, 'preco_final_centavos': vazio,
+            'vencedor': np.zeros(0, dtype=object), 'primeiro_lance_us': vazio,
+            'ultimo_lance_us': vazio, 'lances_por_minuto': np.zeros(0),
+            'usuarios_unicos': vazio
+        }
+
+    fins = np.append(inicios[1:], len(camisa))
+    quantidade = fins - inicios
+
+    preco_final = np.maximum.reduceat(centavos, inicios)
+
+    # Vencedor: primeiro lance (em ordem de horário) que atinge o preço final
+    atinge_final = centavos == np.repeat(preco_final, quantidade)
+    posicoes = np.where(atinge_final, np.arange(len(camisa)), len(camisa))
+    vencedor = usuario[np.minimum.reduceat(posicoes, inicios)]
+
+    # Lances por minuto sobre a duração do leilão (mínimo de um minuto)
+    primeiro = epoch_us[inicios]
+    ultimo = epoch_us[fins - 1]
+    minutos = np.maximum((ultimo - primeiro) / MICROSSEGUNDOS_POR_MINUTO, 1.0)
+
+    # Usuários únicos: reordena por (camisa, usuário) e conta trocas de usuário.
+    # A camisa continua sendo a chave principal, então os grupos têm os mesmos inícios.
+    usuario_por_camisa = usuario[np.lexsort((usuario, camisa))]
+    novo_usuario = np.ones(len(camisa), dtype=np.int64)
+    novo_usuario[1:] = usuario_por_camisa[1:] != usuario_por_camisa[:-1]
+    novo_usuario[inicios] = 1
+
+    return {
+        'camisa_id': colunas['camisas'][camisa[inicios]],
+        'quantidade_lances': quantidade,
+        'preco_inicial_centavos': centavos[inicios],
+        'preco_final_centavos': preco_final,
+        'vencedor': colunas['usuarios'][vencedor],
+        'primeiro_lance_us': primeiro,
+        'ultimo_lance_us': ultimo,
+        'lances_por_minuto': quantidade / minutos,
+        'usuarios_unicos': np.add.reduceat(novo_usuario, inicios)
+    }
+
+
+def curvas_de_preco(colunas):
+    """
+    Calcula a curva de crescimento do preço (maior lance acumulado) por camisa.
+
+    O máximo acumulado por grupo é feito em uma única chamada: cada grupo
+    recebe um deslocamento maior que qualquer valor, o que impede que o
+    máximo de um grupo "vaze" para o seguinte.
+
+    Args:
+        colunas: Resultado de carregar_colunas()
+
+    Returns:
+        dict: camisa_id -> (epoch_us, preco_centavos) em ordem de horário
+    """
+    _exigir_numpy()
+    ordem = np.lexsort((colunas['epoch_us'], colunas['camisa']))
+    camisa = colunas['camisa'][ordem]
+    centavos = colunas['centavos'][ordem]
+    epoch_us = colunas['epoch_us'][ordem]
+
+    inicios = _inicios_dos_grupos(camisa)
+    if len(inicios) == 0:
+        return {}
+
+    fins = np.append(inicios[1:], len(camisa))
+    grupo = np.repeat(np.arange(len(inicios)), fins - inicios)
+    deslocamento = grupo * (int(centavos.max()) + 1)
+    precos = np.maximum.accumulate(centavos + deslocamento) - deslocamento
+
+    nomes = colunas['camisas'][camisa[inicios]]
+    return dict(zip(nomes, zip(np.split(epoch_us, inicios[1:]), np.split(precos, inicios[1:]))))
+
+
+def estatisticas_por_camisa_python(lances=None):
+    """
+    Versão em Python puro, com o mesmo agrupamento de
+    verificar_e_notificar_vencedores. Serve de referência para o benchmark.
+
+    Args:
+        lances: Iterável de lances (padrão: lances_armazenados())
+
+    Returns:
+        dict: camisa_id -> dict com as mesmas estatísticas da versão NumPy
+    """
+    if lances is None:
+        lances = lances_armazenados()
+
+    lances_por_camisa = {}
+    for lance in lances:
+        camisa_id = lance['camisa_id']
+        if camisa_id not in lances_por_camisa:
+            lances_por_camisa[camisa_id] = []
+        lances_por_camisa[camisa_id].append(lance)
+
+    estatisticas = {}
+    for camisa_id, lances_camisa in lances_por_camisa.items():
+        lances_camisa.sort(key=lambda x: x['timestamp'])
+        maior_lance = max(lances_camisa, key=lambda x: x['valor_do_lance'])
+        primeiro = datetime.fromisoformat(lances_camisa[0]['timestamp'])
+        ultimo = datetime.fromisoformat(lances_camisa[-1]['timestamp'])
+        minutos = max((ultimo - primeiro).total_seconds() / 60, 1.0)
+
+        estatisticas[camisa_id] = {
+            'quantidade_lances': len(lances_camisa),
+            'preco_inicial_centavos': round(lances_camisa[0]['valor_do_lance'] * 100),
+            'preco_final_centavos': round(maior_lance['valor_do_lance'] * 100),
+            'vencedor': maior_lance['nome_usuario'],
+            'lances_por_minuto': len(lances_camisa) / minutos,
+            'usuarios_unicos': len({lance['nome_usuario'] for lance in lances_camisa})
+        }
+
+    return estatisticas
+
+
+def gerar_lances_sinteticos(quantidade, camisas=500, usuarios=5000, semente=42):
+    """
+    Gera lances processados fictícios para o benchmark.
+
+    Returns:
+        list: Lances no mesmo formato do banco_lances
+    """
+    gerador = random.Random(semente)
+    inicio = datetime(2026, 1, 1)
+    lances = []
+    for i in range(quantidade):
+        lances.append({
+            'lance_id': f"lance-{i}",
+            'camisa_id': f"CAMISA-{gerador.randrange(camisas):05d}",
+            'nome_usuario': f"usuario-{gerador.randrange(usuarios)}",
+            'valor_do_lance': round(gerador.uniform(50, 5000), 2),
+            'status': 'processado',
+            'timestamp': (inicio + timedelta(seconds=i * 0.5)).isoformat()
+        })
+    return lances
+
+
+def executar_benchmark(quantidade=200000, camisas=500, usuarios=5000, repeticoes=3):
+    """
+    Compara a análise vetorizada com o agrupamento em Python puro.
+
+    Args:
+        quantidade: Total de lances sintéticos
+        camisas: Quantidade de camisas (leilões) distintas
+        usuarios: Quantidade de usuários distintos
+        repeticoes: Execuções de cada versão (vale o melhor tempo)
+
+    Returns:
+        dict: Melhores tempos em segundos ('python', 'numpy_total', 'numpy_agregacao')
+    """
+    _exigir_numpy()
+    lances = gerar_lances_sinteticos(quantidade, camisas, usuarios)
+
+    def melhor_tempo(funcao):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+        return min(tempos)
+
+    colunas = carregar_colunas(lances)
+    tempos = {
+        'python': melhor_tempo(lambda: estatisticas_por_camisa_python(lances)),
+        'numpy_total': melhor_tempo(lambda: estatisticas_por_camisa(carregar_colunas(lances))),
+        'numpy_agregacao': melhor_tempo(lambda: estatisticas_por_camisa(colunas))
+    }
+
+    print("\n" + "="*60)
+    print(f"BENCHMARK: {quantidade} lances | {camisas} camisas | {usuarios} usuarios")
+    print("="*60)
+    print(f"   Python puro:                {tempos['python']:.4f}s")
+    print(f"   NumPy (carga + agregacao):  {tempos['numpy_total']:.4f}s")
+    print(f"   NumPy (so agregacao):       {tempos['numpy_agregacao']:.4f}s")
+    print(f"   Ganho ponta a ponta:        {tempos['python'] / tempos['numpy_total']:.1f}x")
+    print(f"   Ganho so da agregacao:      {tempos['python'] / tempos['numpy_agregacao']:.1f}x"
+          f" (colunas ja carregadas)")
+    print("="*60 + "\n")
+
+    return tempos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark da analise de leiloes')
+    parser.add_argument('--lances', type=int, default=200000)
+    parser.add_argument('--camisas', type=int, default=500)
+    parser.add_argument('--usuarios', type=int, default=5000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    executar_benchmark(args.lances, args.camisas, args.usuarios, args.repeticoes)
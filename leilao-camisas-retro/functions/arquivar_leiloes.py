@@ -0,0 +1,303 @@
+"""
+Lambda Function: ArquivarLeiloes
+Simula um job agendado (EventBridge) que move os lances de leilões encerrados
+ou ociosos do DynamoDB (camada quente) para arquivos de segmento comprimidos
+(camada fria, como objetos no S3).
+
+Formato do segmento (gzip, uma linha JSON por registro):
+    1a linha: cabeçalho com versão, colunas e quantidade de lances
+    demais:   uma lista JSON por coluna (armazenamento colunar)
+
+Cada segmento tem um índice pequeno ao lado (.idx.json) com o intervalo de
+linhas, a quantidade e o maior lance de cada camisa. As consultas leem só
+os índices e abrem apenas os segmentos que contêm a camisa pedida. A
+leitura dos índices fica em functions/indice_arquivo.py.
+"""
+
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from functions.processar_lance import banco_lances
+from functions import indice_arquivo
+from functions.indice_arquivo import DIRETORIO_ARQUIVO, EXTENSAO_INDICE, listar_indices, resumo_arquivado
+
+# Leilões sem lances há mais tempo que isso são considerados ociosos
+OCIOSIDADE_PADRAO_SEGUNDOS = 24 * 60 * 60
+
+# Limita o tamanho de cada segmento (e a memória de uma leitura)
+MAX_LANCES_POR_SEGMENTO = 50000
+
+VERSAO_SEGMENTO = 1
+EXTENSAO_SEGMENTO = '.seg.gz'
+
+
+def lambda_handler(event, context=None):
+    """
+    Handler principal da Lambda no formato AWS.
+
+    Args:
+        event: Dicionário opcional com 'camisas_encerradas' (lista de camisa_id)
+               e 'ociosidade_segundos' (simulando um evento agendado)
+        context: Contexto da execução Lambda (opcional para simulação local)
+
+    Returns:
+        dict: Resposta no formato JSON com statusCode e segmentos gerados
+    """
+    print("\n" + "="*60)
+    print(">>> LAMBDA: ArquivarLeiloes - Iniciando compactacao")
+    print("="*60)
+
+    try:
+        event = event or {}
+        lances_antes = len(banco_lances)
+
+        segmentos = arquivar_leiloes(
+            encerradas=event.get('camisas_encerradas'),
+            ociosidade_segundos=event.get('ociosidade_segundos', OCIOSIDADE_PADRAO_SEGUNDOS)
+        )
+
+        quantidade_arquivada = lances_antes - len(banco_lances)
+
+        print(f"\n[OK] Compactacao concluida!")
+        print(f"   Lances arquivados: {quantidade_arquivada}")
+        print(f"   Segmentos gerados: {len(segmentos)}")
+        print(f"   Lances na camada quente: {len(banco_lances)}")
+        print("="*60 + "\n")
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'mensagem': 'Leiloes arquivados com sucesso',
+                'quantidade_arquivada': quantidade_arquivada,
+                'segmentos': segmentos
+            }, ensure_ascii=False)
+        }
+
+    except Exception as e:
+        print(f"\n[ERRO] Erro inesperado: {str(e)}")
+        print("="*60 + "\n")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'mensagem': f'Erro interno: {str(e)}'
+            })
+        }
+
+
+def selecionar_camisas_para_arquivar(encerradas=None, ociosidade_segundos=OCIOSIDADE_PADRAO_SEGUNDOS, agora=None):
+    """
+    Seleciona as camisas cujo leilão saiu da camada quente.
+
+    Args:
+        encerradas: camisa_id de leilões encerrados explicitamente
+        ociosidade_segundos: Tempo sem lances para considerar o leilão ocioso
+                             (None desativa o critério de ociosidade)
+        agora: Instante de referência (padrão: datetime.now())
+
+    Returns:
+        set: camisa_id a arquivar
+    """
+    selecionadas = set(encerradas or ())
+
+    if ociosidade_segundos is None:
+        return selecionadas
+
+    if agora is None:
+        agora = datetime.now()
+    limite = (agora - timedelta(seconds=ociosidade_segundos)).isoformat()
+
+    # Último lance de cada camisa (timestamps ISO comparam como texto)
+    ultimo_lance = {}
+    for lance in banco_lances:
+        momento = lance.get('processado_em') or lance['timestamp']
+        if momento > ultimo_lance.get(lance['camisa_id'], ''):
+            ultimo_lance[lance['camisa_id']] = momento
+
+    for camisa_id, momento in ultimo_lance.items():
+        if momento < limite:
+            selecionadas.add(camisa_id)
+
+    return selecionadas
+
+
+def arquivar_leiloes(encerradas=None, ociosidade_segundos=OCIOSIDADE_PADRAO_SEGUNDOS, agora=None, diretorio=None):
+    """
+    Move os lances de leilões encerrados ou ociosos para segmentos no disco.
+
+    Os lances só saem do banco_lances depois que o segmento e o índice
+    foram gravados, então uma falha no meio não perde dados.
+
+    Args:
+        encerradas: camisa_id de leilões encerrados explicitamente
+        ociosidade_segundos: Tempo sem lances para considerar o leilão ocioso
+        agora: Instante de referência (padrão: datetime.now())
+        diretorio: Diretório dos segmentos (padrão: DIRETORIO_ARQUIVO)
+
+    Returns:
+        list: Nomes dos segmentos gerados
+    """
+    diretorio = Path(diretorio or indice_arquivo.DIRETORIO_ARQUIVO)
+    camisas = selecionar_camisas_para_arquivar(encerradas, ociosidade_segundos, agora)
+
+    if not camisas:
+        print("\n[INFO] Nenhum leilao encerrado ou ocioso para arquivar")
+        return []
+
+    frios = [lance for lance in banco_lances if lance['camisa_id'] in camisas]
+    if not frios:
+        return []
+
+    # Ordena por camisa e horário: cada camisa ocupa um intervalo contíguo
+    # (camisa_id como texto: o CriarLance aceita ids numéricos, que não
+    # se comparam com os de texto e viram texto no índice JSON)
+    frios.sort(key=lambda x: (str(x['camisa_id']), x['timestamp']))
+
+    diretorio.mkdir(parents=True, exist_ok=True)
+    prefixo = f"segmento_{time.time_ns()}"
+    segmentos = []
+
+    for inicio in range(0, len(frios), MAX_LANCES_POR_SEGMENTO):
+        nome = f"{prefixo}_{len(segmentos):04d}"
+        gravar_segmento(diretorio, nome, frios[inicio:inicio + MAX_LANCES_POR_SEGMENTO])
+        segmentos.append(nome)
+        print(f"\n[SEGMENTO GRAVADO] {nome}")
+
+    # Remove da camada quente (in-place, o banco é compartilhado)
+    banco_lances[:] = [lance for lance in banco_lances if lance['camisa_id'] not in camisas]
+
+    return segmentos
+
+
+def gravar_segmento(diretorio, nome, lances):
+    """
+    Grava um segmento colunar comprimido e o seu índice.
+
+    Args:
+        diretorio: Path do diretório de destino
+        nome: Nome base do segmento (sem extensão)
+        lances: Lances já ordenados por camisa_id e timestamp
+    """
+    colunas = []
+    for lance in lances:
+        for coluna in lance:
+            if coluna not in colunas:
+                colunas.append(coluna)
+
+    indice = {'segmento': nome, 'quantidade': len(lances), 'camisas': {}}
+    for linha, lance in enumerate(lances):
+        chave = str(lance['camisa_id'])
+        entrada = indice['camisas'].get(chave)
+        if entrada is None:
+            entrada = indice['camisas'][chave] = {
+                'linhas': [linha, linha + 1],
+                'quantidade': 0,
+                'maior_lance': lance['valor_do_lance'],
+                'vencedor': lance['nome_usuario'],
+                'primeiro_lance': lance['timestamp'],
+                'ultimo_lance': lance['timestamp']
+            }
+        entrada['linhas'][1] = linha + 1
+        entrada['quantidade'] += 1
+        entrada['ultimo_lance'] = lance['timestamp']
+        if lance['valor_do_lance'] > entrada['maior_lance']:
+            entrada['maior_lance'] = lance['valor_do_lance']
+            entrada['vencedor'] = lance['nome_usuario']
+
+    # Grava em arquivo temporário e renomeia: o segmento nunca fica pela metade
+    caminho = diretorio / (nome + EXTENSAO_SEGMENTO)
+    temporario = caminho.with_suffix('.tmp')
+    with gzip.open(temporario, 'wt', encoding='utf-8') as f:
+        cabecalho = {'versao': VERSAO_SEGMENTO, 'colunas': colunas, 'quantidade': len(lances)}
+        f.write(json.dumps(cabecalho, ensure_ascii=False) + '\n')
+        for coluna in colunas:
+            f.write(json.dumps([lance.get(coluna) for lance in lances], ensure_ascii=False) + '\n')
+    os.replace(temporario, caminho)
+
+    # O índice é gravado por último: se existe, o segmento está completo
+    caminho_indice = diretorio / (nome + EXTENSAO_INDICE)
+    temporario = caminho_indice.with_suffix('.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False)
+    os.replace(temporario, caminho_indice)
+
+    indice_arquivo.registrar_indice(diretorio, indice)
+
+
+def ler_segmento(nome, linhas=None, diretorio=None):
+    """
+    Lê um segmento e devolve os lances um a um.
+
+    Args:
+        nome: Nome base do segmento (sem extensão)
+        linhas: Intervalo [inicio, fim) de linhas a devolver (padrão: todas)
+        diretorio: Diretório dos segmentos (padrão: DIRETORIO_ARQUIVO)
+
+    Yields:
+        dict: Lance reconstruído a partir das colunas
+    """
+    caminho = Path(diretorio or indice_arquivo.DIRETORIO_ARQUIVO) / (nome + EXTENSAO_SEGMENTO)
+    inicio, fim = linhas if linhas else (None, None)
+
+    with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+        cabecalho = json.loads(f.readline())
+        if cabecalho['versao'] != VERSAO_SEGMENTO:
+            raise ValueError(f"Versao de segmento nao suportada: {cabecalho['versao']}")
+
+        # Mantém em memória só o intervalo pedido de cada coluna
+        valores = [json.loads(f.readline())[inicio:fim] for _ in cabecalho['colunas']]
+
+    colunas = cabecalho['colunas']
+    for linha in zip(*valores):
+        yield {coluna: valor for coluna, valor in zip(colunas, linha) if valor is not None}
+
+
+def consultar_arquivo(camisa_id=None, diretorio=None):
+    """
+    Consulta sob demanda o histórico arquivado.
+
+    Args:
+        camisa_id: Filtra por camisa (padrão: todos os lances arquivados)
+        diretorio: Diretório dos segmentos (padrão: DIRETORIO_ARQUIVO)
+
+    Yields:
+        dict: Lances arquivados, segmento a segmento
+    """
+    for indice in listar_indices(diretorio):
+        if camisa_id is None:
+            yield from ler_segmento(indice['segmento'], diretorio=diretorio)
+        elif str(camisa_id) in indice['camisas']:
+            linhas = indice['camisas'][str(camisa_id)]['linhas']
+            yield from ler_segmento(indice['segmento'], linhas, diretorio=diretorio)
+
+
+# Bloco de teste para execução local
+if __name__ == "__main__":
+    print("\n" + "[MODO DE TESTE LOCAL] - ArquivarLeiloes")
+    print("="*60)
+
+    from functions.criar_lance import lambda_handler as criar_lance_handler
+    from functions.processar_lance import lambda_handler as processar_lance_handler
+
+    lances_teste = [
+        {'body': {'camisa_id': 'CAMISA-VASCO-1997', 'nome_usuario': 'João Silva', 'valor_do_lance': 250.00}},
+        {'body': {'camisa_id': 'CAMISA-VASCO-1997', 'nome_usuario': 'Maria Santos', 'valor_do_lance': 350.00}},
+        {'body': {'camisa_id': 'CAMISA-CORINTHIANS-1990', 'nome_usuario': 'Pedro Costa', 'valor_do_lance': 400.00}}
+    ]
+
+    for lance_evento in lances_teste:
+        criar_lance_handler(lance_evento)
+    processar_lance_handler({})
+
+    # Encerra o leilão do Vasco e arquiva
+    resposta = lambda_handler({'camisas_encerradas': ['CAMISA-VASCO-1997']})
+
+    print(f"\n[RESPOSTA DA LAMBDA]")
+    print(json.dumps(resposta, indent=2, ensure_ascii=False))
+
+    print(f"\n[HISTORICO ARQUIVADO] CAMISA-VASCO-1997")
+    for lance in consultar_arquivo('CAMISA-VASCO-1997'):
+        print(f"   - {lance['lance_id'][:8]}... | {lance['nome_usuario']} | R$ {lance['valor_do_lance']:.2f}")
@@ -0,0 +1,295 @@
+"""
+Broker da Fila de Lances
+Processo independente que guarda a fila "Lances Pendentes" e a atende por
+um Unix domain socket (ou TCP local). Permite rodar CriarLance e
+ProcessarLance em processos separados: uma queda do consumidor não afeta
+a ingestão, e cada lado escala nos seus próprios núcleos.
+
+Como na SQS, receber não apaga: os lances ficam em voo por um lease
+(visibility timeout) e só saem com 'confirmar'. Se o consumidor cair antes
+de confirmar, o lease expira e os lances voltam para a fila. A fila de
+atraso das novas tentativas e a DLQ também ficam aqui.
+
+O broker também guarda o maior lance de cada camisa, compartilhado por
+todos os ProcessarLance: cada consumidor só tem na memória os lances que
+ele mesmo processou, então a apuração do vencedor precisa de um estado
+comum (como um update condicional no DynamoDB). Tudo é guardado em
+memória: reiniciar o broker descarta os lances pendentes e esse estado.
+
+Protocolo: uma linha JSON por pedido e uma linha JSON por resposta.
+    {"op": "enviar", "lance": {...}, "atraso": s}     -> {"ok": true, "tamanho": n}
+    {"op": "receber", "max_mensagens": 10,
+     "visibilidade": s}                             -> {"ok": true, "mensagens": [{"recibo", "lance"}]}
+    {"op": "confirmar", "recibos": [...]}             -> {"ok": true, "confirmados": n}
+    {"op": "reagendar", "recibo": r, "lance": {...},
+     "atraso": s}                                   -> {"ok": true, "ignorado": bool}
+    {"op": "enviar_dlq", "recibo": r, "lance": {...}} -> {"ok": true, "ignorado": bool}
+    {"op": "redrive", "limite": n}                    -> {"ok": true, "quantidade": n}
+    {"op": "registrar_maiores",
+     "maiores": {camisa: {"maior_lance", "vencedor"}}} -> {"ok": true, "maiores": {camisa: {...}}}
+    {"op": "espiar"}                                  -> {"ok": true, "lances": [...]}
+    {"op": "tamanho"}                                 -> {"ok": true, "tamanho": n, "em_voo": n,
+                                                          "atrasados": n, "dlq": n}
+    {"op": "limpar"}                                  -> {"ok": true}
+
+'reagendar' e 'enviar_dlq' encerram o lease do recibo; um recibo
+desconhecido (já usado ou com lease vencido) é ignorado, então repetir o
+pedido não duplica o lance. 'registrar_maiores' só troca o maior lance de
+uma camisa por um valor estritamente maior (no empate vale o primeiro
+registrado) e devolve o maior lance atual de cada camisa enviada; repetir
+o pedido não muda o resultado.
+
+Uso:
+    python -m functions.broker_fila --endereco /tmp/leilao-fila.sock
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+
+from functions.fila import resolver_endereco, VISIBILIDADE_PADRAO_SEGUNDOS
+
+ENDERECO_PADRAO = '/tmp/leilao-fila.sock' if hasattr(socket, 'AF_UNIX') else '127.0.0.1:8765'
+
+# Entregas sem confirmação antes de a mensagem ir para a DLQ: protege contra
+# um lance que derruba o consumidor toda vez (maxReceiveCount da SQS)
+MAX_RECEBIMENTOS = 10
+
+# Estado do broker, sempre acessado sob a trava. Cada mensagem é guardada
+# como [lance, recebimentos].
+fila = deque()         # Mensagens visíveis, em ordem FIFO
+em_voo = {}            # recibo -> (visivel_em, mensagem)
+prazos = []            # Heap (visivel_em, recibo) dos leases em voo
+atrasados = []         # Heap (visivel_em, sequencia, mensagem)
+dlq = []               # Lances que esgotaram as tentativas
+maiores = {}           # camisa_id (texto) -> {'maior_lance', 'vencedor'}
+_sequencia = itertools.count()
+_trava = threading.Lock()
+
+
+def _promover(agora):
+    """Devolve à fila os atrasos vencidos e os leases expirados."""
+    while atrasados and atrasados[0][0] <= agora:
+        fila.append(heapq.heappop(atrasados)[2])
+
+    while prazos and prazos[0][0] <= agora:
+        _, recibo = heapq.heappop(prazos)
+        item = em_voo.pop(recibo, None)
+        if item is None:
+            continue  # Já confirmado ou reagendado
+
+        mensagem = item[1]
+        if mensagem[1] < MAX_RECEBIMENTOS:
+            fila.append(mensagem)
+            continue
+
+        lance = mensagem[0]
+        erro = f"Recebido {mensagem[1]} vezes sem confirmacao"
+        if isinstance(lance, dict):
+            lance.update(status='dlq', ultimo_erro=erro)
+            dlq.append(lance)
+        else:
+            dlq.append({'mensagem_bruta': lance, 'ultimo_erro': erro, 'status': 'dlq'})
+
+
+def _encerrar_lease(recibo):
+    """Retira o recibo de em voo; None se ele já não existe."""
+    item = em_voo.pop(recibo, None)
+    return None if item is None else item[1]
+
+
+def executar(pedido, agora=None):
+    """
+    Executa um pedido do protocolo sobre a fila.
+
+    Args:
+        pedido: Dicionário com 'op' e os parâmetros da operação
+        agora: Instante de referência (padrão: time.monotonic())
+
+    Returns:
+        dict: Resposta com 'ok' e os dados da operação (ou 'erro')
+    """
+    op = pedido.get('op')
+    if agora is None:
+        agora = time.monotonic()
+
+    with _trava:
+        _promover(agora)
+
+        if op == 'enviar':
+            mensagem = [pedido['lance'], 0]
+            atraso = pedido.get('atraso') or 0
+            if atraso > 0:
+                heapq.heappush(atrasados, (agora + atraso, next(_sequencia), mensagem))
+            else:
+                fila.append(mensagem)
+            return {'ok': True, 'tamanho': len(fila)}
+
+        if op == 'receber':
+            quantidade = min(int(pedido.get('max_mensagens', 1)), len(fila))
+            visivel_em = agora + float(pedido.get('visibilidade', VISIBILIDADE_PADRAO_SEGUNDOS))
+            mensagens = []
+            for _ in range(quantidade):
+                mensagem = fila.popleft()
+                mensagem[1] += 1
+                recibo = uuid.uuid4().hex
+                em_voo[recibo] = (visivel_em, mensagem)
+                heapq.heappush(prazos, (visivel_em, recibo))
+                mensagens.append({'recibo': recibo, 'lance': mensagem[0]})
+            return {'ok': True, 'mensagens': mensagens}
+
+        if op == 'confirmar':
+            confirmados = sum(1 for recibo in pedido['recibos'] if _encerrar_lease(recibo) is not None)
+            return {'ok': True, 'confirmados': confirmados}
+
+        if op == 'reagendar':
+            mensagem = _encerrar_lease(pedido['recibo'])
+            if mensagem is None:
+                return {'ok': True, 'ignorado': True}
+            mensagem[0] = pedido['lance']
+            heapq.heappush(atrasados, (agora + pedido['atraso'], next(_sequencia), mensagem))
+            return {'ok': True, 'ignorado': False}
+
+        if op == 'enviar_dlq':
+            if _encerrar_lease(pedido['recibo']) is None:
+                return {'ok': True, 'ignorado': True}
+            dlq.append(pedido['lance'])
+            return {'ok': True, 'ignorado': False}
+
+        if op == 'redrive':
+            limite = pedido.get('limite')
+            quantidade = 0
+            restantes = []
+            for lance in dlq:
+                # Mensagens brutas (fora do formato de lance) ficam na DLQ
+                if 'mensagem_bruta' in lance or (limite is not None and quantidade >= limite):
+                    restantes.append(lance)
+                    continue
+                lance['tentativas'] = 0
+                lance['status'] = 'pendente'
+                fila.append([lance, 0])
+                quantidade += 1
+            dlq[:] = restantes
+            return {'ok': True, 'quantidade': quantidade}
+
+        if op == 'registrar_maiores':
+            atuais = {}
+            for camisa_id, candidato in pedido['maiores'].items():
+                atual = maiores.get(camisa_id)
+                if atual is None or candidato['maior_lance'] > atual['maior_lance']:
+                    atual = maiores[camisa_id] = {
+                        'maior_lance': candidato['maior_lance'],
+                        'vencedor': candidato['vencedor']
+                    }
+                atuais[camisa_id] = atual
+            return {'ok': True, 'maiores': atuais}
+
+        if op == 'espiar':
+            # Só leitura: não cria lease nem conta como recebimento
+            return {'ok': True, 'lances': [mensagem[0] for mensagem in fila]}
+
+        if op == 'tamanho':
+            return {
+                'ok': True,
+                'tamanho': len(fila),
+                'em_voo': len(em_voo),
+                'atrasados': len(atrasados),
+                'dlq': len(dlq)
+            }
+
+        if op == 'limpar':
+            fila.clear()
+            em_voo.clear()
+            prazos.clear()
+            atrasados.clear()
+            dlq.clear()
+            maiores.clear()
+            return {'ok': True}
+
+    return {'ok': False, 'erro': f'Operacao desconhecida: {op}'}
+
+
+class _TratadorConexao(socketserver.StreamRequestHandler):
+    """Atende uma conexão (produtor ou consumidor) até ela ser fechada."""
+
+    def handle(self):
+        for linha in self.rfile:
+            try:
+                resposta = executar(json.loads(linha))
+            except Exception as e:
+                resposta = {'ok': False, 'erro': f'{type(e).__name__}: {e}'}
+            self.wfile.write((json.dumps(resposta, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class _ServidorTCP(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def criar_servidor(endereco):
+    """
+    Cria o servidor do broker no endereço informado.
+
+    Um arquivo de socket antigo (de um broker que caiu) é removido antes.
+
+    Returns:
+        socketserver.BaseServer: Servidor pronto para serve_forever()
+    """
+    familia, endereco_socket = resolver_endereco(endereco)
+
+    if familia == socket.AF_INET:
+        return _ServidorTCP(endereco_socket, _TratadorConexao)
+
+    if os.path.exists(endereco_socket):
+        os.unlink(endereco_socket)
+    return _ServidorUnix(endereco_socket, _TratadorConexao)
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description='Broker local da fila de lances')
+    parser.add_argument(
+        '--endereco',
+        default=os.environ.get('LEILAO_FILA_ENDERECO', ENDERECO_PADRAO),
+        help="caminho do Unix socket ou 'host:porta' (porta 0 escolhe uma livre)"
+    )
+    args = parser.parse_args(argv)
+
+    servidor = criar_servidor(args.endereco)
+    if isinstance(servidor.server_address, tuple):
+        host, porta = servidor.server_address[:2]
+        endereco = f"{host}:{porta}"
+    else:
+        endereco = servidor.server_address
+
+    print(f"[OK] Broker da fila ouvindo em {endereco}", flush=True)
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        if not isinstance(servidor.server_address, tuple) and os.path.exists(endereco):
+            os.unlink(endereco)
+        print("\n[OK] Broker da fila encerrado")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,12 +5,29 @@ e envia lances para a fila SQS (simulada como lista Python).
 """
 
 from uuid import uuid4
-from datetime import datetime
 import json
+import math
 
-# Simulação do serviço SQS (Simple Queue Service)
-# Na AWS real, isso seria uma fila SQS real
-fila_lances = []
+from functions.caminho_quente import agora_iso, banner, json_resposta, resposta_constante, SEPARADOR
+from functions.fila import fila_lances, enviar_lance
+from functions.limite_taxa import admitir_lance
+
+# Calculados uma vez por container (cold start), reaproveitados nas invocações
+BANNER = banner("CriarLance")
+RESPOSTA_DADOS_INCOMPLETOS = resposta_constante(
+    400, 'Erro: camisa_id, nome_usuario e valor_do_lance são obrigatórios'
+)
+RESPOSTA_VALOR_INVALIDO = resposta_constante(
+    400, 'Erro: valor_do_lance deve ser um número positivo'
+)
+RESPOSTA_IDENTIFICADOR_INVALIDO = resposta_constante(
+    400, 'Erro: camisa_id e nome_usuario devem ser texto ou número'
+)
+
+
+def _identificador_valido(valor):
+    """Aceita texto ou número (bool não conta como número)."""
+    return isinstance(valor, (str, int, float)) and not isinstance(valor, bool)
 
 
 def lambda_handler(event, context=None):
@@ -24,9 +41,7 @@ def lambda_handler(event, context=None):
     Returns:
         dict: Resposta no formato JSON com statusCode e body
     """
-    print("\n" + "="*60)
-    print(">>> LAMBDA: CriarLance - Iniciando processamento")
-    print("="*60)
+    print(BANNER)
     
     try:
         # Simula a extração do body da requisição do API Gateway
@@ -44,12 +59,13 @@ def lambda_handler(event, context=None):
         # Validação dos dados obrigatórios
         if not all([camisa_id, nome_usuario, valor_do_lance]):
             print("[ERRO] Dados incompletos na requisição")
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'mensagem': 'Erro: camisa_id, nome_usuario e valor_do_lance são obrigatórios'
-                })
-            }
+            return RESPOSTA_DADOS_INCOMPLETOS()
+        
+        # Identificadores viram chaves do limite de taxa e do índice do
+        # arquivo: listas e objetos do JSON não servem
+        if not (_identificador_valido(camisa_id) and _identificador_valido(nome_usuario)):
+            print("[ERRO] camisa_id ou nome_usuario inválido")
+            return RESPOSTA_IDENTIFICADOR_INVALIDO()
         
         # Validação do valor do lance
         try:
@@ -58,10 +74,18 @@ def lambda_handler(event, context=None):
                 raise ValueError("Valor deve ser positivo")
         except (ValueError, TypeError):
             print("[ERRO] Valor do lance inválido")
+            return RESPOSTA_VALOR_INVALIDO()
+        
+        # Controle de admissão: recusa antes de gerar o UUID e de enfileirar
+        espera, chave_limitada = admitir_lance(nome_usuario, camisa_id)
+        if espera > 0:
+            print(f"[ERRO] Limite de lances excedido ({chave_limitada})")
             return {
-                'statusCode': 400,
+                'statusCode': 429,
+                'headers': {'Retry-After': str(math.ceil(espera))},
                 'body': json.dumps({
-                    'mensagem': 'Erro: valor_do_lance deve ser um número positivo'
+                    'mensagem': f'Erro: limite de lances excedido por {chave_limitada}, tente novamente em instantes',
+                    'retry_after': round(espera, 3)
                 })
             }
         
@@ -72,7 +96,7 @@ def lambda_handler(event, context=None):
             'nome_usuario': nome_usuario,
             'valor_do_lance': valor_do_lance,
             'status': 'pendente',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': agora_iso()
         }
         
         print(f"\n[LANCE CRIADO]")
@@ -84,25 +108,26 @@ def lambda_handler(event, context=None):
         
         # Simula o envio para a fila SQS
         # Na AWS real, isso seria: sqs.send_message(QueueUrl=..., MessageBody=...)
-        fila_lances.append(lance)
+        # O tamanho vem na resposta do envio (sem outra ida ao broker)
+        tamanho_fila = enviar_lance(fila_lances, lance)
         
         print(f"\n[OK] Lance enviado para a fila SQS (Lances Pendentes)")
-        print(f"   Total de lances na fila: {len(fila_lances)}")
-        print("="*60 + "\n")
+        print(f"   Total de lances na fila: {tamanho_fila}")
+        print(SEPARADOR + "\n")
         
         # Retorna resposta de sucesso no formato API Gateway
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': json_resposta({
                 'mensagem': 'Lance criado com sucesso',
                 'lance_id': lance['lance_id'],
                 'status': 'pendente'
-            }, ensure_ascii=False)
+            })
         }
         
     except Exception as e:
         print(f"\n[ERRO] Erro inesperado: {str(e)}")
-        print("="*60 + "\n")
+        print(SEPARADOR + "\n")
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -0,0 +1,353 @@
+"""
+Exportação de Dados: Lances e Notificações
+Exporta os lances processados (camada quente e histórico arquivado) e as
+notificações SNS em NDJSON ou CSV, registro a registro, com memória
+constante.
+
+O cursor tem o formato "<fonte>:<posição>", onde a fonte é um segmento
+arquivado, 'quente' (banco_lances) ou 'notificacoes'. Passar o cursor
+devolvido por uma exportação interrompida retoma do registro seguinte.
+Posições na camada quente só são estáveis enquanto a compactação não roda.
+
+Uso pela linha de comando (só o histórico arquivado: a camada quente e as
+notificações vivem na memória do processo das Lambdas, e um processo novo
+as veria vazias; para elas use exportar() dentro desse processo):
+    python -m functions.exportar_dados --formato csv --gzip --saida lances.csv.gz
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+from functions.processar_lance import banco_lances, notificacoes
+from functions import indice_arquivo
+from functions.arquivar_leiloes import listar_indices, ler_segmento, EXTENSAO_INDICE
+
+COLUNAS_LANCES = ['lance_id', 'camisa_id', 'nome_usuario', 'valor_do_lance', 'status', 'timestamp', 'processado_em']
+COLUNAS_NOTIFICACOES = ['tipo', 'camisa_id', 'nome_usuario', 'valor_do_lance', 'timestamp', 'mensagem']
+
+FONTE_QUENTE = 'quente'
+FONTE_NOTIFICACOES = 'notificacoes'
+
+# A cada quantos registros o cursor é salvo no arquivo de checkpoint
+INTERVALO_CHECKPOINT = 10000
+
+
+def _normalizar_instante(valor):
+    """Converte um instante (datetime ou texto ISO) para texto ISO comparável."""
+    if valor is None or isinstance(valor, str) and not valor:
+        return None
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return datetime.fromisoformat(valor).isoformat()
+
+
+def _ler_cursor(cursor):
+    """Separa o cursor em (fonte, posição)."""
+    if not cursor:
+        return None, 0
+    fonte, _, posicao = cursor.rpartition(':')
+    if not fonte or not posicao.isdigit():
+        raise ValueError(f"Cursor invalido: {cursor}")
+    return fonte, int(posicao)
+
+
+def _filtrar(registro, camisa_id, nome_usuario, inicio, fim):
+    """Verifica se o registro passa pelos filtros da exportação."""
+    if camisa_id is not None and registro.get('camisa_id') != camisa_id:
+        return False
+    if nome_usuario is not None and registro.get('nome_usuario') != nome_usuario:
+        return False
+    if inicio is not None and registro.get('timestamp', '') < inicio:
+        return False
+    if fim is not None and registro.get('timestamp', '') >= fim:
+        return False
+    return True
+
+
+def iterar_lances(camisa_id=None, nome_usuario=None, inicio=None, fim=None,
+                  cursor=None, incluir_arquivo=True, diretorio=None, incluir_quente=True):
+    """
+    Percorre os lances processados sem materializar listas.
+
+    Lê primeiro os segmentos arquivados (em ordem) e depois a camada quente.
+    Segmentos cujo índice não contém a camisa ou o intervalo pedido nem são
+    abertos.
+
+    Args:
+        camisa_id: Filtra por camisa
+        nome_usuario: Filtra por usuário
+        inicio: Instante mínimo do lance (inclusive)
+        fim: Instante máximo do lance (exclusive)
+        cursor: Cursor devolvido por uma exportação anterior
+        incluir_arquivo: Se False, exporta só a camada quente
+        diretorio: Diretório dos segmentos arquivados
+        incluir_quente: Se False, exporta só o histórico arquivado
+
+    Yields:
+        tuple: (cursor, lance), onde o cursor retoma após este lance
+
+    Raises:
+        ValueError: Se o cursor não aponta para a camada quente nem para um
+                    segmento arquivado (retomar do início duplicaria a saída)
+    """
+    inicio = _normalizar_instante(inicio)
+    fim = _normalizar_instante(fim)
+    fonte_cursor, posicao_cursor = _ler_cursor(cursor)
+    if fonte_cursor not in (None, FONTE_QUENTE):
+        caminho_indice = os.path.join(str(diretorio or indice_arquivo.DIRETORIO_ARQUIVO), fonte_cursor + EXTENSAO_INDICE)
+        if not os.path.isfile(caminho_indice):
+            raise ValueError(f"Cursor nao pertence aos lances: {cursor}")
+    retomando = fonte_cursor is not None
+
+    if incluir_arquivo and fonte_cursor != FONTE_QUENTE:
+        for indice in listar_indices(diretorio):
+            nome = indice['segmento']
+
+            # Pula os segmentos já exportados
+            if retomando:
+                if nome < fonte_cursor:
+                    continue
+                retomando = False
+            posicao = posicao_cursor if nome == fonte_cursor else 0
+
+            if camisa_id is not None:
+                entrada = indice['camisas'].get(str(camisa_id))
+                if entrada is None:
+                    continue
+                faixas = [entrada]
+            else:
+                faixas = list(indice['camisas'].values())
+
+            # Usa o índice para descartar segmentos fora do intervalo de tempo
+            if inicio is not None:
+                faixas = [f for f in faixas if f['ultimo_lance'] >= inicio]
+            if fim is not None:
+                faixas = [f for f in faixas if f['primeiro_lance'] < fim]
+            if not faixas:
+                continue
+
+            linha_inicial = max(posicao, min(f['linhas'][0] for f in faixas))
+            linha_final = max(f['linhas'][1] for f in faixas)
+            if linha_inicial >= linha_final:
+                continue
+
+            lances = ler_segmento(nome, [linha_inicial, linha_final], diretorio=diretorio)
+            for linha, lance in enumerate(lances, linha_inicial):
+                if _filtrar(lance, camisa_id, nome_usuario, inicio, fim):
+                    yield f"{nome}:{linha + 1}", lance
+
+    if not incluir_quente:
+        return
+
+    posicao = posicao_cursor if fonte_cursor == FONTE_QUENTE else 0
+
+    # Percorre por índice: não copia o banco_lances
+    while posicao < len(banco_lances):
+        lance = banco_lances[posicao]
+        posicao += 1
+        if _filtrar(lance, camisa_id, nome_usuario, inicio, fim):
+            yield f"{FONTE_QUENTE}:{posicao}", lance
+
+
+def iterar_notificacoes(camisa_id=None, nome_usuario=None, inicio=None, fim=None, cursor=None):
+    """
+    Percorre as notificações SNS sem materializar listas.
+
+    Args:
+        camisa_id: Filtra por camisa
+        nome_usuario: Filtra por usuário
+        inicio: Instante mínimo da notificação (inclusive)
+        fim: Instante máximo da notificação (exclusive)
+        cursor: Cursor devolvido por uma exportação anterior
+
+    Yields:
+        tuple: (cursor, notificacao), onde o cursor retoma após esta notificação
+    """
+    inicio = _normalizar_instante(inicio)
+    fim = _normalizar_instante(fim)
+    fonte_cursor, posicao = _ler_cursor(cursor)
+    if fonte_cursor not in (None, FONTE_NOTIFICACOES):
+        raise ValueError(f"Cursor nao pertence as notificacoes: {cursor}")
+
+    while posicao < len(notificacoes):
+        notificacao = notificacoes[posicao]
+        posicao += 1
+        if _filtrar(notificacao, camisa_id, nome_usuario, inicio, fim):
+            yield f"{FONTE_NOTIFICACOES}:{posicao}", notificacao
+
+
+def gerar_ndjson(registros):
+    """
+    Converte (cursor, registro) em linhas NDJSON.
+
+    Yields:
+        tuple: (cursor, linha)
+    """
+    for cursor, registro in registros:
+        yield cursor, json.dumps(registro, ensure_ascii=False) + '\n'
+
+
+def gerar_csv(registros, colunas, cabecalho=True):
+    """
+    Converte (cursor, registro) em linhas CSV.
+
+    Args:
+        registros: Iterável de (cursor, registro)
+        colunas: Colunas do CSV (campos extras são ignorados)
+        cabecalho: Se True, a primeira linha é o cabeçalho
+
+    Yields:
+        tuple: (cursor, linha); o cabeçalho vem com cursor None
+    """
+    class _Linha:
+        valor = ''
+
+        def write(self, texto):
+            self.valor = texto
+
+    linha = _Linha()
+    escritor = csv.DictWriter(linha, fieldnames=colunas, extrasaction='ignore', lineterminator='\n')
+
+    if cabecalho:
+        escritor.writeheader()
+        yield None, linha.valor
+
+    for cursor, registro in registros:
+        escritor.writerow(registro)
+        yield cursor, linha.valor
+
+
+def exportar(tipo='lances', saida='-', formato='ndjson', comprimir=False, cursor=None,
+             arquivo_checkpoint=None, **filtros):
+    """
+    Exporta lances ou notificações para um arquivo (ou stdout).
+
+    Ao retomar com um cursor, a saída é aberta em modo de acréscimo e o
+    cabeçalho CSV não é repetido.
+
+    Args:
+        tipo: 'lances' ou 'notificacoes'
+        saida: Caminho do arquivo ou '-' para stdout
+        formato: 'ndjson' ou 'csv'
+        comprimir: Se True, grava em gzip
+        cursor: Cursor devolvido por uma exportação anterior
+        arquivo_checkpoint: Arquivo onde o cursor é salvo periodicamente
+        **filtros: camisa_id, nome_usuario, inicio, fim (e, para lances,
+                   incluir_arquivo, incluir_quente e diretorio)
+
+    Returns:
+        tuple: (quantidade exportada, cursor final)
+    """
+    if tipo == 'lances':
+        registros = iterar_lances(cursor=cursor, **filtros)
+        colunas = COLUNAS_LANCES
+    elif tipo == 'notificacoes':
+        registros = iterar_notificacoes(cursor=cursor, **filtros)
+        colunas = COLUNAS_NOTIFICACOES
+    else:
+        raise ValueError(f"Tipo de exportacao invalido: {tipo}")
+
+    if formato == 'ndjson':
+        linhas = gerar_ndjson(registros)
+    elif formato == 'csv':
+        linhas = gerar_csv(registros, colunas, cabecalho=cursor is None)
+    else:
+        raise ValueError(f"Formato de exportacao invalido: {formato}")
+
+    modo = 'a' if cursor else 'w'
+    if saida == '-':
+        if comprimir:
+            # Fechar o wrapper finaliza o gzip sem fechar o stdout
+            destino = io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'), encoding='utf-8', newline='')
+        else:
+            destino = sys.stdout
+        fechar = comprimir
+    elif comprimir:
+        destino = gzip.open(saida, modo + 't', encoding='utf-8', newline='')
+        fechar = True
+    else:
+        destino = open(saida, modo, encoding='utf-8', newline='')
+        fechar = True
+
+    quantidade = 0
+    try:
+        for cursor_linha, linha in linhas:
+            destino.write(linha)
+            if cursor_linha is None:
+                continue
+            cursor = cursor_linha
+            quantidade += 1
+
+            if arquivo_checkpoint and quantidade % INTERVALO_CHECKPOINT == 0:
+                destino.flush()
+                salvar_checkpoint(arquivo_checkpoint, cursor)
+    finally:
+        if fechar:
+            destino.close()
+        else:
+            destino.flush()
+
+        # Salvo só depois do flush, inclusive se a exportação for interrompida:
+        # o checkpoint aponta exatamente para o último registro gravado
+        if arquivo_checkpoint and cursor:
+            salvar_checkpoint(arquivo_checkpoint, cursor)
+
+    return quantidade, cursor
+
+
+def salvar_checkpoint(caminho, cursor):
+    """Grava o cursor atual no arquivo de checkpoint."""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(cursor)
+
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Exporta só os lances arquivados: é a única fonte que um processo novo
+    consegue ler.
+    """
+    parser = argparse.ArgumentParser(description='Exporta os lances arquivados em NDJSON/CSV')
+    parser.add_argument('--formato', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--saida', default='-', help="arquivo de saida ('-' para stdout)")
+    parser.add_argument('--gzip', action='store_true', help='comprime a saida com gzip')
+    parser.add_argument('--camisa', dest='camisa_id')
+    parser.add_argument('--usuario', dest='nome_usuario')
+    parser.add_argument('--inicio', help='instante ISO minimo (inclusive)')
+    parser.add_argument('--fim', help='instante ISO maximo (exclusive)')
+    parser.add_argument('--cursor', help='retoma a partir de um cursor anterior')
+    parser.add_argument('--checkpoint', help='arquivo onde o cursor e salvo (e lido, se existir)')
+    parser.add_argument('--diretorio-arquivo', help='diretorio dos segmentos arquivados')
+    args = parser.parse_args(argv)
+
+    cursor = args.cursor
+    if cursor is None and args.checkpoint:
+        try:
+            with open(args.checkpoint, 'r', encoding='utf-8') as f:
+                cursor = f.read().strip() or None
+        except FileNotFoundError:
+            pass
+
+    quantidade, cursor = exportar(
+        'lances', args.saida, args.formato, args.gzip, cursor, args.checkpoint,
+        camisa_id=args.camisa_id,
+        nome_usuario=args.nome_usuario,
+        inicio=args.inicio,
+        fim=args.fim,
+        diretorio=args.diretorio_arquivo,
+        incluir_quente=False
+    )
+
+    print(f"[OK] {quantidade} lance(s) arquivado(s) exportado(s) | cursor: {cursor}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
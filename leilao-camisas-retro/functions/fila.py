@@ -0,0 +1,261 @@
+"""
+Simulação da fila SQS "Lances Pendentes".
+Fica em um módulo próprio para que produtor (CriarLance) e consumidor
+(ProcessarLance) dependam só da fila, e não um do outro.
+
+Por padrão a fila é uma lista Python, e produtor e consumidor precisam
+rodar no mesmo processo. Com LEILAO_FILA_ENDERECO definido, a fila passa a
+ser um broker local (functions/broker_fila.py) e as Lambdas podem rodar em
+processos separados, cada uma no seu núcleo:
+
+    LEILAO_FILA_ENDERECO=/tmp/leilao-fila.sock   # Unix domain socket
+    LEILAO_FILA_ENDERECO=127.0.0.1:8765          # TCP local (ex.: Windows)
+
+A FilaRemota mantém a API usada na lista (append, pop(0), len, clear e
+iteração) e acrescenta a semântica da SQS: receber() entrega os lances
+com um lease (visibility timeout) e só confirmar() os apaga; um lance não
+confirmado volta para a fila quando o lease expira. A fila de atraso e a DLQ também
+ficam no broker, para sobreviverem à queda do consumidor.
+"""
+
+import json
+import os
+
+# socket e threading só são importados com a fila remota: juntos custam
+# alguns milissegundos na importação, e o modo lista (padrão) não os usa
+
+# Tempo que um lote recebido fica invisível aguardando confirmação
+# (VisibilityTimeout da SQS)
+VISIBILIDADE_PADRAO_SEGUNDOS = 30.0
+
+# Operações que não são repetidas depois de chegar ao broker: um 'receber'
+# repetido esconderia um lote até o lease expirar, e um 'redrive' repetido
+# devolveria à fila mais lances que o limite pedido. As demais são seguras
+# para repetir ('confirmar', 'reagendar' e 'enviar_dlq' ignoram recibos já
+# usados; 'enviar' no pior caso duplica um lance, como na SQS).
+OPERACOES_SEM_REPETICAO = {'receber', 'redrive'}
+
+
+def resolver_endereco(endereco):
+    """
+    Converte o endereço do broker para (família, endereço do socket).
+
+    'host:porta' vira TCP; qualquer outro valor é o caminho de um
+    Unix domain socket.
+    """
+    import socket
+
+    host, separador, porta = endereco.rpartition(':')
+    if separador and porta.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(porta))
+    return socket.AF_UNIX, endereco
+
+
+class FilaRemota:
+    """
+    Cliente do broker de fila, com a mesma API da lista Python.
+
+    Usa uma conexão persistente por processo (protegida por trava) e
+    reconecta uma vez se a conexão cair, para sobreviver a reinícios do
+    broker (ver OPERACOES_SEM_REPETICAO).
+    """
+
+    def __init__(self, endereco):
+        import threading
+
+        self.endereco = endereco
+        self._arquivo = None
+        self._trava = threading.Lock()
+
+    def _conectar(self):
+        import socket
+
+        familia, endereco = resolver_endereco(self.endereco)
+        conexao = socket.socket(familia, socket.SOCK_STREAM)
+        conexao.connect(endereco)
+        self._arquivo = conexao.makefile('rwb')
+        conexao.close()  # O arquivo mantém o socket aberto
+
+    def _fechar(self):
+        if self._arquivo is not None:
+            try:
+                self._arquivo.close()
+            except OSError:
+                pass
+            self._arquivo = None
+
+    def _chamar(self, pedido):
+        """Envia um pedido ao broker e devolve a resposta."""
+        mensagem = (json.dumps(pedido, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self._trava:
+            for tentativa in (1, 2):
+                enviado = False
+                try:
+                    if self._arquivo is None:
+                        self._conectar()
+                    self._arquivo.write(mensagem)
+                    self._arquivo.flush()
+                    enviado = True
+
+                    # Depois de um reinício do broker, a escrita em TCP numa
+                    # conexão antiga costuma "dar certo" e a falha só aparece
+                    # aqui, como resposta vazia
+                    linha = self._arquivo.readline()
+                    if not linha:
+                        raise ConnectionError(f"Broker da fila desconectou: {self.endereco}")
+                    break
+                except OSError:
+                    self._fechar()
+                    if tentativa == 2 or (enviado and pedido['op'] in OPERACOES_SEM_REPETICAO):
+                        raise
+
+        resposta = json.loads(linha)
+        if not resposta.get('ok'):
+            raise RuntimeError(f"Erro no broker da fila: {resposta.get('erro')}")
+        return resposta
+
+    def enviar(self, lance, atraso=0):
+        """
+        Envia um lance para a fila (equivalente a sqs.send_message).
+
+        Args:
+            lance: Lance a enfileirar
+            atraso: Segundos até o lance ficar visível (DelaySeconds)
+
+        Returns:
+            int: Lances visíveis na fila depois do envio
+        """
+        return self._chamar({'op': 'enviar', 'lance': lance, 'atraso': atraso})['tamanho']
+
+    def append(self, lance):
+        """Envia um lance para a fila, como list.append."""
+        self.enviar(lance)
+
+    def receber(self, max_mensagens=10, visibilidade=VISIBILIDADE_PADRAO_SEGUNDOS):
+        """
+        Recebe até max_mensagens lances em uma única ida ao broker
+        (equivalente a sqs.receive_message com MaxNumberOfMessages).
+
+        Os lances ficam invisíveis por 'visibilidade' segundos e voltam para
+        a fila se não forem confirmados nesse prazo.
+
+        Returns:
+            list: Pares (recibo, lance), em ordem FIFO
+        """
+        resposta = self._chamar({'op': 'receber', 'max_mensagens': max_mensagens, 'visibilidade': visibilidade})
+        return [(mensagem['recibo'], mensagem['lance']) for mensagem in resposta['mensagens']]
+
+    def confirmar(self, recibos):
+        """Apaga da fila os lances recebidos (equivalente a sqs.delete_message_batch)."""
+        return self._chamar({'op': 'confirmar', 'recibos': list(recibos)})['confirmados']
+
+    def reagendar(self, recibo, lance, atraso):
+        """Troca um lance recebido pela versão atualizada, visível só após 'atraso' segundos."""
+        self._chamar({'op': 'reagendar', 'recibo': recibo, 'lance': lance, 'atraso': atraso})
+
+    def enviar_dlq(self, recibo, mensagem):
+        """Troca um lance recebido por 'mensagem' na DLQ do broker."""
+        self._chamar({'op': 'enviar_dlq', 'recibo': recibo, 'lance': mensagem})
+
+    def redrive(self, limite=None):
+        """Devolve lances da DLQ do broker para a fila e retorna a quantidade."""
+        return self._chamar({'op': 'redrive', 'limite': limite})['quantidade']
+
+    def registrar_maiores(self, candidatos):
+        """
+        Registra no broker o maior lance de cada camisa visto por este
+        consumidor e devolve o maior lance entre todos os consumidores.
+
+        Args:
+            candidatos: camisa_id (texto) -> {'maior_lance', 'vencedor'}
+
+        Returns:
+            dict: camisa_id (texto) -> {'maior_lance', 'vencedor'} atual
+        """
+        return self._chamar({'op': 'registrar_maiores', 'maiores': candidatos})['maiores']
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: 'tamanho' (visíveis), 'em_voo', 'atrasados' e 'dlq'
+        """
+        resposta = self._chamar({'op': 'tamanho'})
+        return {chave: resposta[chave] for chave in ('tamanho', 'em_voo', 'atrasados', 'dlq')}
+
+    def pop(self, indice=0):
+        """Retira e confirma o primeiro lance da fila (só a posição 0 é suportada)."""
+        if indice != 0:
+            raise ValueError("A fila remota so permite retirar o primeiro lance")
+        mensagens = self.receber(1)
+        if not mensagens:
+            raise IndexError("pop from empty queue")
+        recibo, lance = mensagens[0]
+        self.confirmar([recibo])
+        return lance
+
+    def clear(self):
+        """Descarta os lances da fila, da fila de atraso e da DLQ e os maiores lances (sqs.purge_queue)."""
+        self._chamar({'op': 'limpar'})
+
+    def __len__(self):
+        return self._chamar({'op': 'tamanho'})['tamanho']
+
+    def __iter__(self):
+        """Percorre uma cópia dos lances visíveis, sem retirá-los da fila."""
+        return iter(self._chamar({'op': 'espiar'})['lances'])
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+def enviar_lance(fila, lance):
+    """
+    Enfileira um lance na fila, local ou remota.
+
+    Returns:
+        int: Lances na fila depois do envio (sem outra ida ao broker)
+    """
+    if isinstance(fila, FilaRemota):
+        return fila.enviar(lance)
+
+    fila.append(lance)
+    return len(fila)
+
+
+def receber_lote(fila, max_mensagens=10, visibilidade=VISIBILIDADE_PADRAO_SEGUNDOS):
+    """
+    Recebe até max_mensagens lances da fila, local ou remota.
+
+    Na fila remota os lances ficam em voo até confirmar_lote(); na lista
+    eles saem na hora (o recibo é None), já que produtor, consumidor e
+    fila morrem juntos no mesmo processo.
+
+    Args:
+        fila: Lista Python ou FilaRemota
+        max_mensagens: Tamanho máximo do lote
+        visibilidade: Lease em segundos (só na fila remota)
+
+    Returns:
+        list: Pares (recibo, lance), em ordem FIFO
+    """
+    if isinstance(fila, FilaRemota):
+        return fila.receber(max_mensagens, visibilidade)
+
+    lote = fila[:max_mensagens]
+    del fila[:max_mensagens]
+    return [(None, lance) for lance in lote]
+
+
+def confirmar_lote(fila, recibos):
+    """Confirma os lances processados de um lote (na lista não há o que fazer)."""
+    if isinstance(fila, FilaRemota) and recibos:
+        fila.confirmar(recibos)
+
+
+# Simulação do serviço SQS (Simple Queue Service)
+# Na AWS real, isso seria uma fila SQS real
+if os.environ.get('LEILAO_FILA_ENDERECO'):
+    fila_lances = FilaRemota(os.environ['LEILAO_FILA_ENDERECO'])
+else:
+    fila_lances = []
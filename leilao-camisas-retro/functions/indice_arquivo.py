@@ -0,0 +1,87 @@
+"""
+Índices do Histórico Arquivado
+Leitura dos índices (.idx.json) dos segmentos gerados pelo ArquivarLeiloes.
+Fica separado do arquivamento porque o ProcessarLance consulta o resumo dos
+índices na apuração do vencedor: este módulo usa só os e json, e não pesa
+na primeira invocação da Lambda.
+"""
+
+import json
+import os
+
+# Simulação do bucket S3 onde ficam os segmentos arquivados
+DIRETORIO_ARQUIVO = os.environ.get(
+    'LEILAO_DIRETORIO_ARQUIVO',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'arquivo')
+)
+
+EXTENSAO_INDICE = '.idx.json'
+
+# Maior lance arquivado de cada camisa, montado a partir dos índices:
+# diretório -> {camisa_id: {'maior_lance': ..., 'vencedor': ...}}
+_resumos_arquivados = {}
+
+
+def _chave_diretorio(diretorio):
+    """Normaliza o diretório usado como chave do cache de resumos."""
+    return os.path.normpath(os.path.abspath(str(diretorio or DIRETORIO_ARQUIVO)))
+
+
+def listar_indices(diretorio=None):
+    """
+    Percorre os índices dos segmentos arquivados, do mais antigo ao mais novo.
+
+    Args:
+        diretorio: Diretório dos segmentos (padrão: DIRETORIO_ARQUIVO)
+
+    Yields:
+        dict: Índice de cada segmento
+    """
+    diretorio = str(diretorio or DIRETORIO_ARQUIVO)
+    if not os.path.isdir(diretorio):
+        return
+
+    for nome in sorted(os.listdir(diretorio)):
+        if nome.endswith(EXTENSAO_INDICE):
+            with open(os.path.join(diretorio, nome), 'r', encoding='utf-8') as f:
+                yield json.load(f)
+
+
+def _acumular_resumo(resumo, indice):
+    """Incorpora ao resumo o maior lance de cada camisa de um índice."""
+    for camisa_id, entrada in indice['camisas'].items():
+        atual = resumo.get(camisa_id)
+        # Empate: vale o lance arquivado primeiro (o mais antigo)
+        if atual is None or entrada['maior_lance'] > atual['maior_lance']:
+            resumo[camisa_id] = {'maior_lance': entrada['maior_lance'], 'vencedor': entrada['vencedor']}
+
+
+def registrar_indice(diretorio, indice):
+    """Mantém o resumo em memória em dia após gravar um segmento (se já carregado)."""
+    resumo = _resumos_arquivados.get(_chave_diretorio(diretorio))
+    if resumo is not None:
+        _acumular_resumo(resumo, indice)
+
+
+def resumo_arquivado(diretorio=None):
+    """
+    Maior lance e vencedor já arquivados de cada camisa.
+
+    Lido dos índices uma vez por diretório e atualizado a cada segmento
+    gravado por este processo. Um leilão arquivado por ociosidade pode
+    receber lances novos, então a apuração do vencedor precisa somar este
+    histórico à camada quente.
+
+    Args:
+        diretorio: Diretório dos segmentos (padrão: DIRETORIO_ARQUIVO)
+
+    Returns:
+        dict: camisa_id (sempre texto) -> {'maior_lance': valor, 'vencedor': nome_usuario}
+    """
+    chave = _chave_diretorio(diretorio)
+    if chave not in _resumos_arquivados:
+        resumo = {}
+        for indice in listar_indices(chave):
+            _acumular_resumo(resumo, indice)
+        _resumos_arquivados[chave] = resumo
+    return _resumos_arquivados[chave]
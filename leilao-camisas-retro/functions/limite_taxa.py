@@ -0,0 +1,160 @@
+"""
+Limite de Taxa (Token Bucket)
+Controle de admissão da Lambda CriarLance, equivalente ao throttling do
+API Gateway: cada nome_usuario e cada camisa_id tem um balde de tokens.
+Um lance consome um token de cada balde; sem token, a requisição recebe
+429 antes de gerar o UUID ou entrar na fila.
+
+Os baldes são reabastecidos de forma preguiçosa (só quando a chave é
+consultada), ocupam O(1) de memória por chave e o total de chaves
+acompanhadas é limitado por LRU.
+
+Configuração por variáveis de ambiente:
+    LEILAO_LIMITE_TAXA_ATIVO       '0' desativa o limite (padrão '1')
+    LEILAO_LIMITE_USUARIO_RAJADA   lances em rajada por usuário (padrão 20)
+    LEILAO_LIMITE_USUARIO_TAXA     lances por segundo por usuário (padrão 2)
+    LEILAO_LIMITE_CAMISA_RAJADA    lances em rajada por camisa (padrão 100)
+    LEILAO_LIMITE_CAMISA_TAXA      lances por segundo por camisa (padrão 20)
+    LEILAO_LIMITE_MAX_CHAVES       chaves acompanhadas por limitador (padrão 10000)
+
+Taxas devem ser positivas e rajada/max_chaves pelo menos 1; para desligar
+o limite use LEILAO_LIMITE_TAXA_ATIVO=0.
+"""
+
+import os
+import time
+from collections import OrderedDict
+
+LIMITE_ATIVO = os.environ.get('LEILAO_LIMITE_TAXA_ATIVO', '1') != '0'
+
+
+class LimitadorDeTaxa:
+    """
+    Conjunto de token buckets indexados por chave.
+
+    Cada balde guarda só [tokens, último reabastecimento]. Quando há mais
+    chaves que max_chaves, a usada há mais tempo é descartada; se ela
+    voltar, recomeça com o balde cheio.
+    """
+
+    def __init__(self, rajada, taxa_por_segundo, max_chaves=10000):
+        """
+        Args:
+            rajada: Capacidade do balde (lances permitidos de uma vez)
+            taxa_por_segundo: Tokens devolvidos ao balde por segundo
+            max_chaves: Máximo de chaves acompanhadas (LRU)
+        
+        Raises:
+            ValueError: Se a configuração não permitir nenhum lance ou
+                        nenhuma chave acompanhada
+        """
+        if rajada < 1:
+            raise ValueError(f"rajada deve ser pelo menos 1, recebido {rajada}")
+        if taxa_por_segundo <= 0:
+            raise ValueError(f"taxa_por_segundo deve ser positiva, recebido {taxa_por_segundo}")
+        if max_chaves < 1:
+            raise ValueError(f"max_chaves deve ser pelo menos 1, recebido {max_chaves}")
+        
+        self.rajada = float(rajada)
+        self.taxa_por_segundo = float(taxa_por_segundo)
+        self.max_chaves = max_chaves
+        self._baldes = OrderedDict()
+
+    def __len__(self):
+        return len(self._baldes)
+
+    def _reabastecer(self, chave, agora):
+        """Atualiza os tokens do balde da chave e a marca como usada recentemente."""
+        balde = self._baldes.get(chave)
+        if balde is None:
+            balde = self._baldes[chave] = [self.rajada, agora]
+            if len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+        else:
+            self._baldes.move_to_end(chave)
+            balde[0] = min(self.rajada, balde[0] + (agora - balde[1]) * self.taxa_por_segundo)
+            balde[1] = agora
+        return balde
+
+    def tempo_de_espera(self, chave, agora=None):
+        """
+        Consulta o balde sem consumir token.
+
+        Returns:
+            float: 0 se há token disponível, senão segundos até o próximo token
+        """
+        if agora is None:
+            agora = time.monotonic()
+        tokens = self._reabastecer(chave, agora)[0]
+        if tokens >= 1:
+            return 0.0
+        return (1 - tokens) / self.taxa_por_segundo
+
+    def debitar(self, chave):
+        """Consome um token (use depois de tempo_de_espera() devolver 0)."""
+        self._baldes[chave][0] -= 1
+
+    def consumir(self, chave, agora=None):
+        """
+        Tenta consumir um token da chave.
+
+        Returns:
+            float: 0 se o token foi consumido, senão segundos até o próximo token
+        """
+        espera = self.tempo_de_espera(chave, agora)
+        if espera == 0:
+            self.debitar(chave)
+        return espera
+
+    def clear(self):
+        """Descarta todos os baldes."""
+        self._baldes.clear()
+
+
+_max_chaves = int(os.environ.get('LEILAO_LIMITE_MAX_CHAVES', 10000))
+
+limite_por_usuario = LimitadorDeTaxa(
+    rajada=float(os.environ.get('LEILAO_LIMITE_USUARIO_RAJADA', 20)),
+    taxa_por_segundo=float(os.environ.get('LEILAO_LIMITE_USUARIO_TAXA', 2)),
+    max_chaves=_max_chaves
+)
+
+limite_por_camisa = LimitadorDeTaxa(
+    rajada=float(os.environ.get('LEILAO_LIMITE_CAMISA_RAJADA', 100)),
+    taxa_por_segundo=float(os.environ.get('LEILAO_LIMITE_CAMISA_TAXA', 20)),
+    max_chaves=_max_chaves
+)
+
+
+def admitir_lance(nome_usuario, camisa_id, agora=None):
+    """
+    Decide se um lance entra no sistema.
+
+    Os dois baldes são consultados antes de qualquer débito: um lance
+    recusado pelo limite da camisa não gasta o token do usuário.
+
+    Args:
+        nome_usuario: Usuário que fez o lance
+        camisa_id: Camisa do leilão
+        agora: Instante de referência (padrão: time.monotonic())
+
+    Returns:
+        tuple: (espera em segundos, chave que estourou o limite ou None)
+    """
+    if not LIMITE_ATIVO:
+        return 0.0, None
+
+    if agora is None:
+        agora = time.monotonic()
+
+    espera_usuario = limite_por_usuario.tempo_de_espera(nome_usuario, agora)
+    espera_camisa = limite_por_camisa.tempo_de_espera(camisa_id, agora)
+
+    if espera_usuario > 0 or espera_camisa > 0:
+        if espera_usuario >= espera_camisa:
+            return espera_usuario, 'nome_usuario'
+        return espera_camisa, 'camisa_id'
+
+    limite_por_usuario.debitar(nome_usuario)
+    limite_por_camisa.debitar(camisa_id)
+    return 0.0, None
@@ -4,21 +4,57 @@ Simula o comportamento de uma Lambda que processa mensagens da SQS,
 salva no DynamoDB e envia notificações via SNS.
 """
 
+import heapq
 import json
-from datetime import datetime
+import random
+import time
 
-# Importa a fila compartilhada do criar_lance
+from functions.caminho_quente import agora_iso, banner, json_resposta, SEPARADOR
+
+# Importa a fila compartilhada (sem carregar a Lambda CriarLance)
 # Em produção, isso seria uma fila SQS real
-from functions.criar_lance import fila_lances
+from functions.fila import fila_lances, FilaRemota, receber_lote, confirmar_lote
+from functions.indice_arquivo import resumo_arquivado
 
 # Simulação do serviço DynamoDB (NoSQL Database)
 # Na AWS real, isso seria uma tabela DynamoDB real
 banco_lances = []
 
+# lance_id de todos os lances já salvos (a chave primária da tabela). A fila
+# remota entrega pelo menos uma vez: um lance reentregue é descartado aqui.
+# Continua valendo depois que o lance é arquivado.
+lances_salvos = set()
+
 # Simulação do serviço SNS (Simple Notification Service)
 # Na AWS real, isso seria um tópico SNS real
 notificacoes = []
 
+# Simulação da fila de atraso (equivalente ao DelaySeconds da SQS)
+# Cada item é (visivel_em, sequencia, lance), organizado como heap
+# Com a fila remota, a fila de atraso e a DLQ ficam no broker
+fila_lances_atrasados = []
+
+# Simulação da Dead-Letter Queue (DLQ) associada à fila de lances
+# Na AWS real, isso seria a fila configurada na redrive policy da SQS
+fila_lances_dlq = []
+
+# Política de reentrega (equivalente ao maxReceiveCount da redrive policy)
+MAX_TENTATIVAS = 5
+ATRASO_BASE_SEGUNDOS = 1.0
+ATRASO_MAXIMO_SEGUNDOS = 900.0  # Limite de DelaySeconds da SQS (15 minutos)
+
+_sequencia_atraso = 0
+
+# Lances retirados da fila por vez (MaxNumberOfMessages da SQS)
+TAMANHO_LOTE = 10
+
+# Prazo para processar e confirmar um lote antes de o broker entregá-lo de
+# novo (VisibilityTimeout da SQS; só vale com a fila remota)
+VISIBILIDADE_SEGUNDOS = 30.0
+
+# Calculado uma vez por container (cold start), reaproveitado nas invocações
+BANNER = banner("ProcessarLance")
+
 
 def lambda_handler(event, context=None):
     """
@@ -31,9 +67,7 @@ def lambda_handler(event, context=None):
     Returns:
         dict: Resposta no formato JSON com statusCode e quantidade processada
     """
-    print("\n" + "="*60)
-    print(">>> LAMBDA: ProcessarLance - Iniciando processamento")
-    print("="*60)
+    print(BANNER)
     
     try:
         # Simula a leitura de mensagens da SQS
@@ -41,27 +75,47 @@ def lambda_handler(event, context=None):
         # Para simulação local, vamos processar todos os lances pendentes da fila
         
         lances_processados = []
+        lances_com_falha = 0
+        lances_duplicados = 0
         
-        # Processa todos os lances pendentes na fila
-        while fila_lances:
-            lance = fila_lances.pop(0)  # Remove o primeiro lance da fila (FIFO)
-            
-            print(f"\n[PROCESSANDO LANCE]")
-            print(f"   ID: {lance['lance_id']}")
-            print(f"   Camisa: {lance['camisa_id']}")
-            print(f"   Usuario: {lance['nome_usuario']}")
-            print(f"   Valor: R$ {lance['valor_do_lance']:.2f}")
-            
-            # Atualiza o status do lance
-            lance['status'] = 'processado'
-            lance['processado_em'] = datetime.now().isoformat()
+        # Devolve para a fila os lances cujo atraso de reentrega já expirou
+        liberar_lances_atrasados()
+        
+        # Processa todos os lances pendentes na fila, em lotes FIFO
+        # (como o receive_message da SQS): com a fila remota, é uma ida
+        # ao broker por lote, e não por lance
+        while True:
+            lote = receber_lote(fila_lances, TAMANHO_LOTE, VISIBILIDADE_SEGUNDOS)
+            if not lote:
+                break
             
-            # Simula o salvamento no DynamoDB
-            # Na AWS real, isso seria: dynamodb.put_item(TableName=..., Item=...)
-            banco_lances.append(lance)
-            lances_processados.append(lance)
+            confirmados = []
+            for recibo, lance in lote:
+                # Mensagem fora do formato de lance: não há como reprocessar
+                if not isinstance(lance, dict):
+                    lances_com_falha += 1
+                    enviar_para_dlq_bruta(lance, TypeError(f"mensagem nao e um lance: {type(lance).__name__}"), recibo)
+                    continue
+                
+                # Falhas são tratadas por mensagem: o lance com problema é
+                # reagendado (ou vai para a DLQ) e o restante do lote segue
+                try:
+                    salvo = processar_mensagem(lance)
+                except Exception as e:
+                    lances_com_falha += 1
+                    agendar_nova_tentativa(lance, e, recibo)
+                    continue
+                
+                # Reentregas também são confirmadas, para saírem da fila
+                confirmados.append(recibo)
+                if salvo:
+                    lances_processados.append(lance)
+                else:
+                    lances_duplicados += 1
             
-            print(f"   [OK] Lance salvo no DynamoDB")
+            # Só agora os lances saem do broker: se o processo cair antes,
+            # eles são entregues de novo quando o lease expirar
+            confirmar_lote(fila_lances, confirmados)
         
         # Verifica o maior lance para cada camisa e envia notificações
         if lances_processados:
@@ -69,24 +123,32 @@ def lambda_handler(event, context=None):
             verificar_e_notificar_vencedores()
         
         quantidade_processada = len(lances_processados)
+        aguardando, na_dlq = contar_pendencias()
         
         print(f"\n[OK] Processamento concluido!")
         print(f"   Lances processados: {quantidade_processada}")
+        print(f"   Lances com falha: {lances_com_falha}")
+        print(f"   Lances duplicados descartados: {lances_duplicados}")
         print(f"   Total no banco: {len(banco_lances)}")
-        print("="*60 + "\n")
+        print(f"   Aguardando nova tentativa: {aguardando}")
+        print(f"   Lances na DLQ: {na_dlq}")
+        print(SEPARADOR + "\n")
         
         # Retorna resposta de sucesso
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': json_resposta({
                 'mensagem': 'Lances processados com sucesso',
-                'quantidade_processada': quantidade_processada
-            }, ensure_ascii=False)
+                'quantidade_processada': quantidade_processada,
+                'quantidade_com_falha': lances_com_falha,
+                'quantidade_duplicada': lances_duplicados,
+                'quantidade_na_dlq': na_dlq
+            })
         }
         
     except Exception as e:
         print(f"\n[ERRO] Erro inesperado: {str(e)}")
-        print("="*60 + "\n")
+        print(SEPARADOR + "\n")
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -95,6 +157,212 @@ def lambda_handler(event, context=None):
         }
 
 
+def processar_mensagem(lance):
+    """
+    Processa um único lance retirado da fila e salva no DynamoDB.
+    
+    Args:
+        lance: Dicionário com os dados do lance
+    
+    Returns:
+        bool: False se o lance já estava salvo (reentrega) e foi ignorado
+    
+    Raises:
+        Exception: Qualquer falha no processamento; o lance não é salvo
+    """
+    if lance['lance_id'] in lances_salvos:
+        print(f"\n[DUPLICADO] Lance {lance['lance_id']} ja salvo - reentrega ignorada")
+        return False
+    
+    print(f"\n[PROCESSANDO LANCE]")
+    print(f"   ID: {lance['lance_id']}")
+    print(f"   Camisa: {lance['camisa_id']}")
+    print(f"   Usuario: {lance['nome_usuario']}")
+    print(f"   Valor: R$ {lance['valor_do_lance']:.2f}")
+    
+    # Atualiza o status do lance
+    lance['status'] = 'processado'
+    lance['processado_em'] = agora_iso()
+    
+    # Simula o salvamento no DynamoDB
+    # Na AWS real, isso seria: dynamodb.put_item(TableName=..., Item=...)
+    banco_lances.append(lance)
+    lances_salvos.add(lance['lance_id'])
+    
+    print(f"   [OK] Lance salvo no DynamoDB")
+    return True
+
+
+def calcular_atraso(tentativas):
+    """
+    Calcula o atraso da próxima entrega com backoff exponencial e jitter.
+    
+    Usa "full jitter": um valor aleatório entre zero e o teto exponencial,
+    para que lances que falharam juntos não voltem todos ao mesmo tempo.
+    
+    Args:
+        tentativas: Número de tentativas já realizadas (1 na primeira falha)
+    
+    Returns:
+        float: Atraso em segundos
+    """
+    teto = min(ATRASO_MAXIMO_SEGUNDOS, ATRASO_BASE_SEGUNDOS * (2 ** (tentativas - 1)))
+    return random.uniform(0, teto)
+
+
+def contar_pendencias():
+    """
+    Conta os lances aguardando nova tentativa e os itens na DLQ, locais ou do broker.
+    
+    Returns:
+        tuple: (lances aguardando nova tentativa, itens na DLQ)
+    """
+    if isinstance(fila_lances, FilaRemota):
+        estatisticas = fila_lances.estatisticas()
+        return estatisticas['atrasados'], estatisticas['dlq']
+    return len(fila_lances_atrasados), len(fila_lances_dlq)
+
+
+def agendar_nova_tentativa(lance, erro, recibo=None):
+    """
+    Registra a falha de um lance e o reagenda na fila de atraso ou na DLQ.
+    
+    Nunca propaga exceções: se o próprio reagendamento falhar, a mensagem
+    vai para a DLQ como está, e o restante do lote segue.
+    
+    Args:
+        lance: Dicionário com os dados do lance que falhou
+        erro: Exceção que causou a falha
+        recibo: Recibo da entrega (só na fila remota)
+    """
+    global _sequencia_atraso
+    
+    if not isinstance(lance, dict):
+        enviar_para_dlq_bruta(lance, erro, recibo)
+        return
+    
+    try:
+        lance['tentativas'] = lance.get('tentativas', 0) + 1
+        lance['ultimo_erro'] = f"{type(erro).__name__}: {erro}"
+        lance['status'] = 'pendente'
+        lance.pop('processado_em', None)
+        
+        print(f"\n[FALHA] Lance {lance.get('lance_id', '?')} - {lance['ultimo_erro']}")
+        
+        if lance['tentativas'] >= MAX_TENTATIVAS:
+            # Simula a redrive policy: após maxReceiveCount vai para a DLQ
+            lance['status'] = 'dlq'
+            if isinstance(fila_lances, FilaRemota):
+                fila_lances.enviar_dlq(recibo, lance)
+            else:
+                fila_lances_dlq.append(lance)
+            print(f"   [DLQ] Lance enviado para a DLQ apos {lance['tentativas']} tentativas")
+            return
+        
+        atraso = calcular_atraso(lance['tentativas'])
+        if isinstance(fila_lances, FilaRemota):
+            fila_lances.reagendar(recibo, lance, atraso)
+        else:
+            _sequencia_atraso += 1
+            heapq.heappush(fila_lances_atrasados, (time.time() + atraso, _sequencia_atraso, lance))
+        
+        print(f"   [RETRY] Tentativa {lance['tentativas']}/{MAX_TENTATIVAS} em {atraso:.2f}s")
+    except Exception as e:
+        enviar_para_dlq_bruta(lance, e, recibo)
+
+
+def enviar_para_dlq_bruta(mensagem, erro, recibo=None):
+    """
+    Envia para a DLQ uma mensagem que não pode ser reagendada.
+    
+    A mensagem original é guardada intacta em 'mensagem_bruta'; esses
+    itens não voltam para a fila no redrive, precisam de correção manual.
+    Também nunca propaga exceções: se a DLQ do broker estiver fora, a
+    mensagem segue sem confirmação e volta quando o lease expirar.
+    
+    Args:
+        mensagem: Conteúdo recebido da fila, de qualquer tipo
+        erro: Exceção que causou a falha
+        recibo: Recibo da entrega (só na fila remota)
+    """
+    item = {
+        'mensagem_bruta': mensagem,
+        'ultimo_erro': f"{type(erro).__name__}: {erro}",
+        'status': 'dlq'
+    }
+    
+    if isinstance(fila_lances, FilaRemota):
+        try:
+            fila_lances.enviar_dlq(recibo, item)
+        except Exception as e:
+            print(f"\n[ERRO] DLQ do broker indisponivel ({e}); mensagem volta para a fila quando o lease expirar")
+            return
+    else:
+        fila_lances_dlq.append(item)
+    
+    print(f"\n[DLQ] Mensagem invalida enviada para a DLQ - {type(erro).__name__}: {erro}")
+
+
+def liberar_lances_atrasados(agora=None):
+    """
+    Move para a fila principal os lances cujo atraso já expirou.
+    
+    Com a fila remota não há nada a mover: o broker libera os atrasos.
+    
+    Args:
+        agora: Instante de referência em segundos (padrão: time.time())
+    
+    Returns:
+        int: Quantidade de lances devolvidos para a fila
+    """
+    if agora is None:
+        agora = time.time()
+    
+    liberados = 0
+    while fila_lances_atrasados and fila_lances_atrasados[0][0] <= agora:
+        _, _, lance = heapq.heappop(fila_lances_atrasados)
+        fila_lances.append(lance)
+        liberados += 1
+    
+    return liberados
+
+
+def reprocessar_dlq(limite=None):
+    """
+    Redrive: devolve os lances da DLQ para a fila principal.
+    
+    O contador de tentativas é zerado para que cada lance ganhe um novo
+    ciclo completo de reentregas. Mensagens brutas continuam na DLQ.
+    
+    Args:
+        limite: Quantidade máxima de lances a devolver (padrão: todos)
+    
+    Returns:
+        int: Quantidade de lances devolvidos para a fila
+    """
+    if isinstance(fila_lances, FilaRemota):
+        quantidade = fila_lances.redrive(limite)
+        print(f"\n[REDRIVE] {quantidade} lance(s) devolvido(s) da DLQ do broker para a fila")
+        return quantidade
+    
+    quantidade = 0
+    restantes = []
+    
+    for lance in fila_lances_dlq:
+        # Mensagens brutas (fora do formato de lance) ficam na DLQ
+        if 'mensagem_bruta' in lance or (limite is not None and quantidade >= limite):
+            restantes.append(lance)
+            continue
+        lance['tentativas'] = 0
+        lance['status'] = 'pendente'
+        fila_lances.append(lance)
+        quantidade += 1
+    fila_lances_dlq[:] = restantes
+    
+    print(f"\n[REDRIVE] {quantidade} lance(s) devolvido(s) da DLQ para a fila")
+    return quantidade
+
+
 def verificar_e_notificar_vencedores():
     """
     Verifica qual é o maior lance para cada camisa e envia notificações SNS.
@@ -110,17 +378,37 @@ def verificar_e_notificar_vencedores():
         lances_por_camisa[camisa_id].append(lance)
     
     # Para cada camisa, encontra o maior lance
+    maiores = {}
     for camisa_id, lances in lances_por_camisa.items():
         maior_lance = max(lances, key=lambda x: x['valor_do_lance'])
+        maiores[camisa_id] = {'maior_lance': maior_lance['valor_do_lance'], 'vencedor': maior_lance['nome_usuario']}
+    
+    # Com a fila remota pode haver outros ProcessarLance, cada um com só os
+    # seus lances na memória: o maior lance de cada camisa fica no broker
+    if isinstance(fila_lances, FilaRemota) and maiores:
+        compartilhados = fila_lances.registrar_maiores({str(camisa_id): maior for camisa_id, maior in maiores.items()})
+        maiores = {camisa_id: compartilhados[str(camisa_id)] for camisa_id in maiores}
+    
+    # Lances de leilões já arquivados (por ociosidade) continuam valendo
+    arquivados = resumo_arquivado()
+    
+    for camisa_id, maior in maiores.items():
+        vencedor = maior['vencedor']
+        valor = maior['maior_lance']
+        
+        anterior = arquivados.get(str(camisa_id))
+        if anterior is not None and anterior['maior_lance'] >= valor:
+            vencedor = anterior['vencedor']
+            valor = anterior['maior_lance']
         
         # Cria a notificação
         notificacao = {
             'tipo': 'lance_vencedor',
             'camisa_id': camisa_id,
-            'nome_usuario': maior_lance['nome_usuario'],
-            'valor_do_lance': maior_lance['valor_do_lance'],
-            'timestamp': datetime.now().isoformat(),
-            'mensagem': f"[VENCEDOR] {maior_lance['nome_usuario']} esta vencendo o leilao da {camisa_id} com lance de R$ {maior_lance['valor_do_lance']:.2f}!"
+            'nome_usuario': vencedor,
+            'valor_do_lance': valor,
+            'timestamp': agora_iso(),
+            'mensagem': f"[VENCEDOR] {vencedor} esta vencendo o leilao da {camisa_id} com lance de R$ {valor:.2f}!"
         }
         
         # Simula o envio para o SNS
@@ -0,0 +1,138 @@
+"""
+Medição de Cold Start e Overhead por Invocação
+Sobe processos Python novos (como containers Lambda recém-criados) e mede,
+em cada um: o tempo de importação das Lambdas, a primeira invocação (cold)
+e as invocações seguintes (warm). Compara o modo padrão, o modo quente
+(LEILAO_MODO_QUENTE=1) e o modo quente com orjson (LEILAO_JSON_ORJSON=1).
+
+Uso:
+    python medir_cold_start.py --processos 20 --invocacoes 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Código executado dentro de cada processo novo
+SCRIPT_CONTAINER = r"""
+import contextlib, io, json, sys, time
+
+inicio = time.perf_counter()
+from functions.processar_lance import lambda_handler as processar
+importacao_processar = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+from functions.criar_lance import lambda_handler as criar
+importacao_criar = time.perf_counter() - inicio
+
+evento = {'body': {'camisa_id': 'CAMISA-VASCO-1997', 'nome_usuario': 'João Silva', 'valor_do_lance': 250.00}}
+invalido = {'body': {'camisa_id': 'CAMISA-TESTE', 'nome_usuario': 'Teste Erro'}}
+invocacoes = int(sys.argv[1])
+
+# Os prints das Lambdas são descartados para medir só o handler
+with contextlib.redirect_stdout(io.StringIO()):
+    inicio = time.perf_counter()
+    criar(evento)
+    cold_criar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    processar({})
+    cold_processar = time.perf_counter() - inicio
+
+    warm_criar, warm_invalido, warm_processar = [], [], []
+    for _ in range(invocacoes):
+        inicio = time.perf_counter()
+        criar(evento)
+        warm_criar.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        criar(invalido)
+        warm_invalido.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        processar({})
+        warm_processar.append(time.perf_counter() - inicio)
+
+print(json.dumps({
+    'importacao_processar': importacao_processar,
+    'importacao_criar': importacao_criar,
+    'cold_criar': cold_criar,
+    'cold_processar': cold_processar,
+    'warm_criar': warm_criar,
+    'warm_invalido': warm_invalido,
+    'warm_processar': warm_processar,
+}))
+"""
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) pelo método do vizinho mais próximo."""
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def medir_modo(variaveis, processos, invocacoes):
+    """
+    Executa a medição em vários processos novos.
+
+    Args:
+        variaveis: Variáveis de ambiente que definem o modo
+        processos: Quantidade de processos (cold starts) a medir
+        invocacoes: Invocações warm por processo
+
+    Returns:
+        dict: Listas de tempos (segundos) por métrica, juntando todos os processos
+    """
+    # O limite de taxa fica desligado: as invocações repetem o mesmo usuário
+    ambiente = dict(os.environ, LEILAO_LIMITE_TAXA_ATIVO='0', **variaveis)
+    diretorio = Path(__file__).parent
+
+    metricas = {}
+    for _ in range(processos):
+        saida = subprocess.run(
+            [sys.executable, '-c', SCRIPT_CONTAINER, str(invocacoes)],
+            cwd=diretorio, env=ambiente, capture_output=True, text=True, check=True
+        )
+        resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+        for nome, valor in resultado.items():
+            metricas.setdefault(nome, []).extend(valor if isinstance(valor, list) else [valor])
+
+    return metricas
+
+
+def main():
+    """Executa a medição nos dois modos e imprime a comparação."""
+    parser = argparse.ArgumentParser(description='Mede cold start e overhead das Lambdas')
+    parser.add_argument('--processos', type=int, default=20)
+    parser.add_argument('--invocacoes', type=int, default=200)
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("MEDICAO DE COLD START - LEILAO DE CAMISAS RETRO")
+    print(f"   {args.processos} processo(s) x {args.invocacoes} invocacao(oes) warm")
+    print("="*70)
+
+    resultados = {
+        'padrao': medir_modo({'LEILAO_MODO_QUENTE': '0'}, args.processos, args.invocacoes),
+        'quente': medir_modo({'LEILAO_MODO_QUENTE': '1'}, args.processos, args.invocacoes),
+        'orjson': medir_modo({'LEILAO_MODO_QUENTE': '1', 'LEILAO_JSON_ORJSON': '1'}, args.processos, args.invocacoes)
+    }
+
+    print(f"\n{'metrica':<24}{'modo':<10}{'p50 (us)':>12}{'p99 (us)':>12}")
+    print("-"*58)
+    for metrica in resultados['padrao']:
+        for modo, metricas in resultados.items():
+            p50 = percentil(metricas[metrica], 50) * 1e6
+            p99 = percentil(metricas[metrica], 99) * 1e6
+            print(f"{metrica:<24}{modo:<10}{p50:>12.1f}{p99:>12.1f}")
+
+    print("="*70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,9 +3,16 @@ Script de Teste Completo do Sistema de Leilão
 Testa todo o fluxo: API Gateway -> Lambda CriarLance -> SQS -> Lambda ProcessarLance -> DynamoDB -> SNS
 """
 
+import csv
+import gzip
 import json
 import os
+import socket
+import subprocess
 import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Adiciona o diretório pai ao path para importar os módulos
@@ -14,6 +21,17 @@ sys.path.insert(0, str(Path(__file__).parent / "functions"))
 
 from functions.criar_lance import lambda_handler as criar_lance_handler, fila_lances
 from functions.processar_lance import lambda_handler as processar_lance_handler, banco_lances, notificacoes
+from functions.processar_lance import (
+    fila_lances_atrasados, fila_lances_dlq, lances_salvos, liberar_lances_atrasados, reprocessar_dlq, MAX_TENTATIVAS
+)
+from functions.arquivar_leiloes import arquivar_leiloes, consultar_arquivo, listar_indices
+from functions import indice_arquivo
+from functions.exportar_dados import exportar
+from functions import exportar_dados
+from functions import analise_leiloes
+from functions.limite_taxa import limite_por_usuario, limite_por_camisa, LimitadorDeTaxa
+from functions.fila import FilaRemota
+from functions import caminho_quente
 
 
 def carregar_json(caminho):
@@ -46,7 +64,12 @@ def limpar_dados():
     """Limpa os dados simulados para começar testes limpos."""
     fila_lances.clear()
     banco_lances.clear()
+    lances_salvos.clear()
     notificacoes.clear()
+    fila_lances_atrasados.clear()
+    fila_lances_dlq.clear()
+    limite_por_usuario.clear()
+    limite_por_camisa.clear()
 
 
 def testar_criar_lance_sucesso():
@@ -128,7 +151,8 @@ def testar_criar_lance_erros():
     eventos_erro = [
         "testes/evento_criar_lance_erro_01.json",  # Falta valor_do_lance
         "testes/evento_criar_lance_erro_02.json",  # Valor negativo
-        "testes/evento_criar_lance_erro_03.json"   # Valor inválido (string)
+        "testes/evento_criar_lance_erro_03.json",  # Valor inválido (string)
+        "testes/evento_criar_lance_erro_04.json"   # nome_usuario não é texto nem número
     ]
     
     resultados = []
@@ -151,10 +175,10 @@ def testar_criar_lance_erros():
             resultados.append({
                 'arquivo': arquivo,
                 'status_code': resposta.get('statusCode'),
-                'esperado_erro': resposta.get('statusCode') != 200
+                'esperado_erro': resposta.get('statusCode') == 400
             })
             
-            if resposta.get('statusCode') != 200:
+            if resposta.get('statusCode') == 400:
                 print(f"[OK] Erro capturado corretamente! Status: {resposta.get('statusCode')}")
             else:
                 print(f"[FALHA] Erro deveria ter sido capturado!")
@@ -299,6 +323,564 @@ def testar_fluxo_completo():
     return True
 
 
+def testar_falhas_retry_dlq():
+    """Testa o tratamento de falhas por mensagem (retry com backoff e DLQ)."""
+    print("\n" + "="*70)
+    print("TESTE 5: Processar Lances - Falhas, Retry e DLQ")
+    print("="*70)
+    
+    limpar_dados()
+    
+    # Um lance corrompido no meio do lote não pode derrubar os demais
+    criar_lance_handler({"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "João", "valor_do_lance": 200.00}})
+    fila_lances.append({'lance_id': 'lance-corrompido', 'camisa_id': 'CAMISA-VASCO-1997', 'status': 'pendente'})
+    criar_lance_handler({"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Maria", "valor_do_lance": 300.00}})
+    
+    print("\n[ETAPA 1] Processando lote com lance corrompido...")
+    resposta = processar_lance_handler({})
+    body = json.loads(resposta['body'])
+    
+    if resposta['statusCode'] != 200 or body['quantidade_processada'] != 2 or body['quantidade_com_falha'] != 1:
+        print(f"[ERRO] Lote deveria processar 2 lances e falhar 1: {body}")
+        return False
+    
+    if len(fila_lances_atrasados) != 1 or len(fila_lances) != 0:
+        print(f"[ERRO] Lance corrompido deveria aguardar nova tentativa na fila de atraso")
+        return False
+    
+    print("\n[ETAPA 2] Esgotando as tentativas...")
+    for _ in range(MAX_TENTATIVAS - 1):
+        liberar_lances_atrasados(agora=float('inf'))
+        processar_lance_handler({})
+    
+    if len(fila_lances_dlq) != 1 or len(fila_lances_atrasados) != 0:
+        print(f"[ERRO] Lance deveria estar na DLQ apos {MAX_TENTATIVAS} tentativas")
+        return False
+    
+    if fila_lances_dlq[0]['tentativas'] != MAX_TENTATIVAS or 'KeyError' not in fila_lances_dlq[0]['ultimo_erro']:
+        print(f"[ERRO] Metadados de falha incorretos: {fila_lances_dlq[0]}")
+        return False
+    
+    print("\n[ETAPA 3] Redrive da DLQ apos corrigir o lance...")
+    fila_lances_dlq[0].update({'nome_usuario': 'Ana', 'valor_do_lance': 500.00})
+    reprocessar_dlq()
+    processar_lance_handler({})
+    
+    if len(fila_lances_dlq) != 0 or len(banco_lances) != 3:
+        print(f"[ERRO] Lance reprocessado deveria estar no banco")
+        return False
+    
+    print("\n[ETAPA 4] Mensagem que nao e um lance no meio do lote...")
+    limpar_dados()
+    criar_lance_handler({"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "João", "valor_do_lance": 200.00}})
+    fila_lances.append('lixo')
+    criar_lance_handler({"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Maria", "valor_do_lance": 300.00}})
+    resposta = processar_lance_handler({})
+    
+    if resposta['statusCode'] != 200 or len(banco_lances) != 2 or len(fila_lances) != 0:
+        print(f"[ERRO] Mensagem invalida nao pode derrubar o lote: {resposta}")
+        return False
+    
+    if len(fila_lances_dlq) != 1 or fila_lances_dlq[0]['mensagem_bruta'] != 'lixo' or len(fila_lances_atrasados) != 0:
+        print(f"[ERRO] Mensagem invalida deveria ir direto para a DLQ: {fila_lances_dlq}")
+        return False
+    
+    if reprocessar_dlq() != 0 or len(fila_lances_dlq) != 1:
+        print(f"[ERRO] Mensagem bruta nao deveria voltar para a fila no redrive")
+        return False
+    
+    print("\n[ETAPA 5] Lance entregue de novo (entrega pelo menos uma vez)...")
+    fila_lances.append(dict(banco_lances[0]))
+    resposta = processar_lance_handler({})
+    corpo = json.loads(resposta['body'])
+    
+    if len(banco_lances) != 2 or corpo['quantidade_duplicada'] != 1 or corpo['quantidade_processada'] != 0:
+        print(f"[ERRO] Reentrega nao deveria duplicar o lance no banco: {corpo}")
+        return False
+    
+    print("   [OK] Falhas isoladas, reagendadas e reprocessadas corretamente!")
+    print(f"   [OK] Lances no DynamoDB: {len(banco_lances)}")
+    
+    return True
+
+
+def testar_arquivamento():
+    """Testa o arquivamento de leilões encerrados e ociosos em segmentos."""
+    print("\n" + "="*70)
+    print("TESTE 6: Arquivar Leiloes - DynamoDB -> Segmentos Comprimidos")
+    print("="*70)
+    
+    limpar_dados()
+    
+    eventos = [
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "João", "valor_do_lance": 200.00}},
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Maria", "valor_do_lance": 300.00}},
+        {"body": {"camisa_id": "CAMISA-CORINTHIANS-1990", "nome_usuario": "Pedro", "valor_do_lance": 400.00}},
+        {"body": {"camisa_id": "CAMISA-SANTOS-1980", "nome_usuario": "Ana", "valor_do_lance": 500.00}}
+    ]
+    for evento in eventos:
+        criar_lance_handler(evento)
+    processar_lance_handler({})
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        print("\n[ETAPA 1] Arquivando leilao encerrado (Vasco)...")
+        segmentos = arquivar_leiloes(encerradas=['CAMISA-VASCO-1997'], diretorio=diretorio)
+        
+        if len(segmentos) != 1 or len(banco_lances) != 2:
+            print(f"[ERRO] Deveria gerar 1 segmento e manter 2 lances quentes")
+            return False
+        
+        if any(l['camisa_id'] == 'CAMISA-VASCO-1997' for l in banco_lances):
+            print(f"[ERRO] Lances do Vasco deveriam ter saido da camada quente")
+            return False
+        
+        print("\n[ETAPA 2] Arquivando leiloes ociosos...")
+        amanha = datetime.now() + timedelta(days=1)
+        arquivar_leiloes(ociosidade_segundos=60, agora=amanha, diretorio=diretorio)
+        
+        if len(banco_lances) != 0:
+            print(f"[ERRO] Todos os leiloes deveriam estar ociosos")
+            return False
+        
+        print("\n[ETAPA 3] Consultando o historico arquivado...")
+        indices = list(listar_indices(diretorio))
+        vasco = list(consultar_arquivo('CAMISA-VASCO-1997', diretorio=diretorio))
+        todos = list(consultar_arquivo(diretorio=diretorio))
+        
+        if len(indices) != 2 or len(todos) != 4:
+            print(f"[ERRO] Arquivo deveria ter 2 segmentos e 4 lances")
+            return False
+        
+        if [l['nome_usuario'] for l in vasco] != ['João', 'Maria'] or indices[0]['camisas']['CAMISA-VASCO-1997']['vencedor'] != 'Maria':
+            print(f"[ERRO] Historico do Vasco incorreto: {vasco}")
+            return False
+        
+        print("\n[ETAPA 4] Lance baixo em leilao arquivado por ociosidade...")
+        diretorio_original = indice_arquivo.DIRETORIO_ARQUIVO
+        indice_arquivo.DIRETORIO_ARQUIVO = diretorio
+        try:
+            criar_lance_handler({"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Baixo", "valor_do_lance": 10.00}})
+            processar_lance_handler({})
+        finally:
+            indice_arquivo.DIRETORIO_ARQUIVO = diretorio_original
+        
+        notif_vasco = [n for n in notificacoes if n['camisa_id'] == 'CAMISA-VASCO-1997'][-1]
+        if notif_vasco['nome_usuario'] != 'Maria' or notif_vasco['valor_do_lance'] != 300.00:
+            print(f"[ERRO] Historico arquivado ignorado na apuracao: {notif_vasco['mensagem']}")
+            return False
+        
+        print("\n[ETAPA 5] camisa_id numerico junto de ids de texto...")
+        indice_arquivo.DIRETORIO_ARQUIVO = diretorio
+        try:
+            criar_lance_handler({"body": {"camisa_id": 1997, "nome_usuario": "Numero", "valor_do_lance": 900.00}})
+            processar_lance_handler({})
+            arquivar_leiloes(ociosidade_segundos=60, agora=amanha, diretorio=diretorio)
+            criar_lance_handler({"body": {"camisa_id": 1997, "nome_usuario": "Baixo", "valor_do_lance": 50.00}})
+            processar_lance_handler({})
+        finally:
+            indice_arquivo.DIRETORIO_ARQUIVO = diretorio_original
+        
+        notif_numero = [n for n in notificacoes if n['camisa_id'] == 1997][-1]
+        arquivados = [l['nome_usuario'] for l in consultar_arquivo(1997, diretorio=diretorio)]
+        if notif_numero['nome_usuario'] != 'Numero' or arquivados != ['Numero']:
+            print(f"[ERRO] camisa_id numerico deveria ser arquivado e consultado: {notif_numero['mensagem']} {arquivados}")
+            return False
+    
+    print("   [OK] Leiloes arquivados e consultados corretamente!")
+    
+    return True
+
+
+def testar_exportacao():
+    """Testa a exportação em streaming de lances e notificações."""
+    print("\n" + "="*70)
+    print("TESTE 7: Exportar Dados - NDJSON/CSV com Filtros e Cursor")
+    print("="*70)
+    
+    limpar_dados()
+    
+    eventos = [
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "João", "valor_do_lance": 200.00}},
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Maria", "valor_do_lance": 300.00}},
+        {"body": {"camisa_id": "CAMISA-CORINTHIANS-1990", "nome_usuario": "Pedro", "valor_do_lance": 400.00}},
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "João", "valor_do_lance": 500.00}}
+    ]
+    for evento in eventos:
+        criar_lance_handler(evento)
+    processar_lance_handler({})
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        # O Corinthians vai para o arquivo: a exportação deve juntar as duas camadas
+        arquivar_leiloes(encerradas=['CAMISA-CORINTHIANS-1990'], diretorio=diretorio)
+        
+        print("\n[ETAPA 1] Exportando NDJSON filtrado por usuario...")
+        saida = os.path.join(diretorio, 'lances.ndjson')
+        quantidade, _ = exportar('lances', saida, nome_usuario='João', diretorio=diretorio)
+        with open(saida, 'r', encoding='utf-8') as f:
+            valores = [json.loads(linha)['valor_do_lance'] for linha in f]
+        
+        if quantidade != 2 or valores != [200.00, 500.00]:
+            print(f"[ERRO] Exportacao filtrada incorreta: {valores}")
+            return False
+        
+        print("\n[ETAPA 2] Exportando CSV comprimido em duas partes (cursor)...")
+        saida = os.path.join(diretorio, 'lances.csv.gz')
+        filtros = {'diretorio': diretorio}
+        total, _ = exportar('lances', saida, 'csv', True, **filtros)
+        parcial, cursor = exportar('lances', saida, 'csv', True, cursor='quente:1', **filtros)
+        with gzip.open(saida, 'rt', encoding='utf-8', newline='') as f:
+            linhas = list(csv.DictReader(f))
+        
+        if total != 4 or parcial != 2 or len(linhas) != 6 or cursor != 'quente:3':
+            print(f"[ERRO] Exportacao CSV/cursor incorreta: {total}, {parcial}, {cursor}")
+            return False
+        
+        if linhas[0]['camisa_id'] != 'CAMISA-CORINTHIANS-1990' or linhas[-1]['nome_usuario'] != 'João':
+            print(f"[ERRO] Ordem da exportacao incorreta")
+            return False
+        
+        print("\n[ETAPA 3] Retomando exportacao interrompida pelo checkpoint...")
+        saida = os.path.join(diretorio, 'interrompida.ndjson')
+        checkpoint = os.path.join(diretorio, 'cursor.txt')
+        iterar_original = exportar_dados.iterar_lances
+        
+        def iterar_interrompido(**kwargs):
+            for i, item in enumerate(iterar_original(**kwargs)):
+                if i == 2:
+                    raise KeyboardInterrupt
+                yield item
+        
+        exportar_dados.iterar_lances = iterar_interrompido
+        try:
+            exportar('lances', saida, arquivo_checkpoint=checkpoint, diretorio=diretorio)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            exportar_dados.iterar_lances = iterar_original
+        
+        with open(checkpoint, 'r', encoding='utf-8') as f:
+            cursor = f.read()
+        exportar('lances', saida, cursor=cursor, arquivo_checkpoint=checkpoint, diretorio=diretorio)
+        with open(saida, 'r', encoding='utf-8') as f:
+            ids = [json.loads(linha)['lance_id'] for linha in f]
+        
+        if len(ids) != 4 or len(set(ids)) != 4:
+            print(f"[ERRO] Retomada deveria gerar 4 lances sem duplicatas, gerou {len(ids)}")
+            return False
+        
+        print("\n[ETAPA 4] Exportando notificacoes...")
+        saida = os.path.join(diretorio, 'notificacoes.ndjson')
+        quantidade, _ = exportar('notificacoes', saida, camisa_id='CAMISA-VASCO-1997')
+        
+        if quantidade != 1:
+            print(f"[ERRO] Deveria exportar 1 notificacao do Vasco, exportou {quantidade}")
+            return False
+        
+        print("\n[ETAPA 5] Cursor de notificacoes numa exportacao de lances...")
+        saida = os.path.join(diretorio, 'lances.ndjson')
+        try:
+            exportar('lances', saida, cursor='notificacoes:1', diretorio=diretorio)
+            print(f"[ERRO] Cursor de outra fonte deveria ser recusado")
+            return False
+        except ValueError:
+            pass
+        
+        with open(saida, 'r', encoding='utf-8') as f:
+            if len(f.readlines()) != 2:
+                print(f"[ERRO] Cursor recusado nao deveria acrescentar lances a saida")
+                return False
+    
+    print("   [OK] Exportacoes geradas corretamente!")
+    
+    return True
+
+
+def testar_analise_leiloes():
+    """Testa a análise vetorizada contra o agrupamento em Python puro."""
+    print("\n" + "="*70)
+    print("TESTE 8: Analise de Leiloes - NumPy vs Python Puro")
+    print("="*70)
+    
+    print("\n[ETAPA 1] Estatisticas padrao incluem os leiloes arquivados...")
+    limpar_dados()
+    eventos = [
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "João", "valor_do_lance": 200.00}},
+        {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Maria", "valor_do_lance": 300.00}},
+        {"body": {"camisa_id": "CAMISA-SANTOS-1980", "nome_usuario": "Ana", "valor_do_lance": 500.00}}
+    ]
+    for evento in eventos:
+        criar_lance_handler(evento)
+    processar_lance_handler({})
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        diretorio_original = indice_arquivo.DIRETORIO_ARQUIVO
+        indice_arquivo.DIRETORIO_ARQUIVO = diretorio
+        try:
+            arquivar_leiloes(encerradas=['CAMISA-VASCO-1997'], diretorio=diretorio)
+            armazenadas = analise_leiloes.estatisticas_por_camisa_python()
+            if analise_leiloes.np is not None:
+                colunas_armazenadas = analise_leiloes.estatisticas_por_camisa(analise_leiloes.carregar_colunas())
+        finally:
+            indice_arquivo.DIRETORIO_ARQUIVO = diretorio_original
+    
+    vasco = armazenadas.get('CAMISA-VASCO-1997', {})
+    if vasco.get('quantidade_lances') != 2 or vasco.get('vencedor') != 'Maria' or len(armazenadas) != 2:
+        print(f"[ERRO] Leilao arquivado deveria entrar nas estatisticas: {armazenadas}")
+        return False
+    
+    if analise_leiloes.np is None:
+        print("   [INFO] NumPy nao instalado - comparacao vetorizada ignorada")
+        return True
+    
+    if sorted(colunas_armazenadas['camisa_id']) != sorted(armazenadas):
+        print(f"[ERRO] Carga de colunas padrao deveria incluir o arquivo: {colunas_armazenadas['camisa_id']}")
+        return False
+    
+    print("\n[ETAPA 2] Comparando NumPy e Python puro...")
+    lances = analise_leiloes.gerar_lances_sinteticos(2000, camisas=20, usuarios=15)
+    colunas = analise_leiloes.carregar_colunas(lances)
+    vetorizada = analise_leiloes.estatisticas_por_camisa(colunas)
+    referencia = analise_leiloes.estatisticas_por_camisa_python(lances)
+    
+    if sorted(vetorizada['camisa_id']) != sorted(referencia):
+        print(f"[ERRO] Camisas divergentes entre as duas versoes")
+        return False
+    
+    for i, camisa_id in enumerate(vetorizada['camisa_id']):
+        for campo, esperado in referencia[camisa_id].items():
+            obtido = vetorizada[campo][i]
+            if abs(obtido - esperado) > 1e-9 if isinstance(esperado, float) else obtido != esperado:
+                print(f"[ERRO] {camisa_id}.{campo}: {obtido} != {esperado}")
+                return False
+    
+    curvas = analise_leiloes.curvas_de_preco(colunas)
+    for camisa_id, (_, precos) in curvas.items():
+        if any(precos[1:] < precos[:-1]) or precos[-1] != referencia[camisa_id]['preco_final_centavos']:
+            print(f"[ERRO] Curva de preco incorreta para {camisa_id}")
+            return False
+    
+    print(f"   [OK] Estatisticas identicas para {len(referencia)} camisas!")
+    
+    return True
+
+
+def testar_limite_taxa():
+    """Testa o limite de taxa por usuário e por camisa na criação de lances."""
+    print("\n" + "="*70)
+    print("TESTE 9: Limite de Taxa - Token Bucket por Usuario e Camisa")
+    print("="*70)
+    
+    limpar_dados()
+    
+    rajada = int(limite_por_usuario.rajada)
+    
+    print(f"\n[ETAPA 1] Robo enviando {rajada + 5} lances em sequencia...")
+    status = []
+    for i in range(rajada + 5):
+        evento = {"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Robo", "valor_do_lance": 100.00 + i}}
+        status.append(criar_lance_handler(evento)['statusCode'])
+    
+    if status.count(200) != rajada or status.count(429) != 5 or len(fila_lances) != rajada:
+        print(f"[ERRO] Esperado {rajada} lances aceitos e 5 recusados: {status}")
+        return False
+    
+    print("\n[ETAPA 2] Outro usuario na mesma camisa continua sendo atendido...")
+    resposta = criar_lance_handler({"body": {"camisa_id": "CAMISA-VASCO-1997", "nome_usuario": "Maria", "valor_do_lance": 900.00}})
+    
+    if resposta['statusCode'] != 200:
+        print(f"[ERRO] Lance legitimo nao deveria ser limitado: {resposta}")
+        return False
+    
+    print("\n[ETAPA 3] Verificando a resposta 429...")
+    resposta = criar_lance_handler({"body": {"camisa_id": "CAMISA-SANTOS-1980", "nome_usuario": "Robo", "valor_do_lance": 100.00}})
+    
+    if resposta['statusCode'] != 429 or int(resposta['headers']['Retry-After']) < 1:
+        print(f"[ERRO] Resposta 429 incorreta: {resposta}")
+        return False
+    
+    print("\n[ETAPA 4] Configuracoes invalidas sao recusadas...")
+    for parametros in ({'rajada': 20, 'taxa_por_segundo': 0}, {'rajada': 0, 'taxa_por_segundo': 2},
+                       {'rajada': 20, 'taxa_por_segundo': 2, 'max_chaves': 0}):
+        try:
+            LimitadorDeTaxa(**parametros)
+        except ValueError:
+            continue
+        print(f"[ERRO] Configuracao invalida aceita: {parametros}")
+        return False
+    
+    print("   [OK] Robo limitado sem afetar os demais usuarios!")
+    
+    return True
+
+
+# Lambdas executadas em processos separados, ligadas só pelo broker da fila
+SCRIPT_PRODUTOR = """
+from functions.criar_lance import lambda_handler
+for nome, valor in [('João', 200.00), ('Maria', 300.00), ('Ana', 500.00)]:
+    resposta = lambda_handler({'body': {'camisa_id': 'CAMISA-VASCO-1997', 'nome_usuario': nome, 'valor_do_lance': valor}})
+    assert resposta['statusCode'] == 200, resposta
+"""
+
+SCRIPT_CONSUMIDOR = """
+import json
+from functions.processar_lance import lambda_handler, notificacoes
+resposta = lambda_handler({})
+vencedor = notificacoes[-1]['nome_usuario'] if notificacoes else None
+print(json.dumps({'body': json.loads(resposta['body']), 'vencedor': vencedor}))
+"""
+
+
+def iniciar_broker(endereco, script_dir):
+    """Sobe o broker da fila em um subprocesso e devolve (processo, endereço real)."""
+    broker = subprocess.Popen(
+        [sys.executable, '-m', 'functions.broker_fila', '--endereco', endereco],
+        cwd=script_dir, stdout=subprocess.PIPE, text=True
+    )
+    # O broker informa o endereço real (a porta TCP pode ser escolhida por ele)
+    return broker, broker.stdout.readline().rsplit(' ', 1)[-1].strip()
+
+
+def parar_broker(broker):
+    """Encerra o subprocesso do broker."""
+    broker.terminate()
+    broker.wait()
+    broker.stdout.close()
+
+
+def testar_fila_entre_processos():
+    """Testa produtor e consumidor em processos separados via broker da fila."""
+    print("\n" + "="*70)
+    print("TESTE 10: Fila entre Processos - CriarLance | Broker | ProcessarLance")
+    print("="*70)
+    
+    limpar_dados()
+    script_dir = Path(__file__).parent
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        endereco = os.path.join(diretorio, 'fila.sock') if hasattr(socket, 'AF_UNIX') else '127.0.0.1:0'
+        broker, endereco = iniciar_broker(endereco, script_dir)
+        
+        try:
+            ambiente = dict(os.environ, LEILAO_FILA_ENDERECO=endereco)
+            
+            print("\n[ETAPA 1] Processo produtor criando lances...")
+            produtor = subprocess.run([sys.executable, '-c', SCRIPT_PRODUTOR], cwd=script_dir,
+                                      env=ambiente, capture_output=True, text=True)
+            fila_remota = FilaRemota(endereco)
+            
+            if produtor.returncode != 0 or len(fila_remota) != 3:
+                print(f"[ERRO] Produtor deveria enfileirar 3 lances no broker: {produtor.stderr}")
+                return False
+            
+            if [lance['nome_usuario'] for lance in fila_remota] != ['João', 'Maria', 'Ana'] or len(fila_remota) != 3:
+                print(f"[ERRO] Percorrer a fila remota deveria listar os lances sem retira-los")
+                return False
+            
+            print("\n[ETAPA 2] Consumidor recebe o lote e cai antes de confirmar...")
+            if len(fila_remota.receber(10, visibilidade=0.2)) != 3 or len(fila_remota) != 0:
+                print(f"[ERRO] Lances recebidos deveriam ficar invisiveis durante o lease")
+                return False
+            time.sleep(0.3)
+            if len(fila_remota) != 3:
+                print(f"[ERRO] Lances nao confirmados deveriam voltar para a fila: {fila_remota.estatisticas()}")
+                return False
+            
+            print("\n[ETAPA 3] Processo consumidor processando lances...")
+            consumidor = subprocess.run([sys.executable, '-c', SCRIPT_CONSUMIDOR], cwd=script_dir,
+                                        env=ambiente, capture_output=True, text=True)
+            if consumidor.returncode != 0:
+                print(f"[ERRO] Consumidor falhou: {consumidor.stderr}")
+                return False
+            
+            resultado = json.loads(consumidor.stdout.strip().splitlines()[-1])
+            if resultado['body']['quantidade_processada'] != 3 or resultado['vencedor'] != 'Ana':
+                print(f"[ERRO] Consumidor deveria processar 3 lances com Ana vencendo: {resultado}")
+                return False
+            
+            if fila_remota.estatisticas() != {'tamanho': 0, 'em_voo': 0, 'atrasados': 0, 'dlq': 0}:
+                print(f"[ERRO] Fila do broker deveria estar vazia: {fila_remota.estatisticas()}")
+                return False
+            
+            print("\n[ETAPA 4] Outro consumidor recebe um lance menor na mesma camisa...")
+            fila_remota.append({
+                'lance_id': 'lance-baixo', 'camisa_id': 'CAMISA-VASCO-1997', 'nome_usuario': 'Baixo',
+                'valor_do_lance': 300.00, 'status': 'pendente', 'timestamp': datetime.now().isoformat()
+            })
+            consumidor = subprocess.run([sys.executable, '-c', SCRIPT_CONSUMIDOR], cwd=script_dir,
+                                        env=ambiente, capture_output=True, text=True)
+            resultado = json.loads(consumidor.stdout.strip().splitlines()[-1])
+            if resultado['body']['quantidade_processada'] != 1 or resultado['vencedor'] != 'Ana':
+                print(f"[ERRO] Vencedor deveria continuar Ana, apurado entre os consumidores: {resultado}")
+                return False
+            
+            print("\n[ETAPA 5] Falhas ficam no broker depois que o consumidor termina...")
+            fila_remota.append({'lance_id': 'incompleto'})
+            fila_remota.append('lixo')
+            consumidor = subprocess.run([sys.executable, '-c', SCRIPT_CONSUMIDOR], cwd=script_dir,
+                                        env=ambiente, capture_output=True, text=True)
+            resultado = json.loads(consumidor.stdout.strip().splitlines()[-1])
+            estatisticas = fila_remota.estatisticas()
+            if resultado['body']['quantidade_com_falha'] != 2 or estatisticas['atrasados'] != 1 or estatisticas['dlq'] != 1:
+                print(f"[ERRO] Broker deveria guardar 1 lance atrasado e 1 na DLQ: {resultado} {estatisticas}")
+                return False
+            
+        finally:
+            parar_broker(broker)
+    
+    # Em TCP, escrever na conexão de um broker que reiniciou não falha: o
+    # erro só aparece como resposta vazia, e o cliente precisa repetir
+    print("\n[ETAPA 6] Reinicio do broker TCP com a conexao do cliente aberta...")
+    broker, endereco = iniciar_broker('127.0.0.1:0', script_dir)
+    try:
+        fila_remota = FilaRemota(endereco)
+        fila_remota.enviar({'lance_id': 'antes'})
+        parar_broker(broker)
+        broker, _ = iniciar_broker(endereco, script_dir)
+        
+        # A fila é só memória: o reinício descarta o que estava pendente
+        if fila_remota.enviar({'lance_id': 'depois'}) != 1 or len(fila_remota) != 1:
+            print(f"[ERRO] Cliente deveria reconectar ao broker reiniciado")
+            return False
+    finally:
+        parar_broker(broker)
+    
+    print("   [OK] Produtor e consumidor comunicando pelo broker!")
+    
+    return True
+
+
+def testar_modo_quente():
+    """Testa que o modo quente gera as mesmas respostas e horários válidos."""
+    print("\n" + "="*70)
+    print("TESTE 11: Modo Quente - Serializacao e Horario")
+    print("="*70)
+    
+    dados = {'mensagem': 'Lance criado com sucesso', 'nome_usuario': 'João', 'valor_do_lance': 250.5, 'lances': [1, 2]}
+    originais = (caminho_quente.MODO_QUENTE, caminho_quente.USAR_ORJSON)
+    
+    try:
+        for modo_quente in (False, True):
+            # No modo quente também exercita o orjson (se estiver instalado)
+            caminho_quente.MODO_QUENTE = caminho_quente.USAR_ORJSON = modo_quente
+            nome_modo = 'quente' if modo_quente else 'padrao'
+            
+            if json.loads(caminho_quente.json_resposta(dados)) != json.loads(json.dumps(dados)):
+                print(f"[ERRO] json_resposta diverge do json.dumps no modo {nome_modo}")
+                return False
+            
+            try:
+                datetime.fromisoformat(caminho_quente.agora_iso())
+            except ValueError:
+                print(f"[ERRO] agora_iso invalido no modo {nome_modo}: {caminho_quente.agora_iso()}")
+                return False
+            
+            print(f"   [OK] Modo {nome_modo}: respostas e horarios validos")
+    finally:
+        caminho_quente.MODO_QUENTE, caminho_quente.USAR_ORJSON = originais
+    
+    return True
+
+
 def main():
     """Executa todos os testes."""
     print("\n" + "="*70)
@@ -312,6 +894,13 @@ def main():
     resultados.append(("Teste 2: Criar Lances (Erros)", testar_criar_lance_erros()))
     resultados.append(("Teste 3: Processar Lances", testar_processar_lance()))
     resultados.append(("Teste 4: Fluxo Completo", testar_fluxo_completo()))
+    resultados.append(("Teste 5: Falhas, Retry e DLQ", testar_falhas_retry_dlq()))
+    resultados.append(("Teste 6: Arquivar Leiloes", testar_arquivamento()))
+    resultados.append(("Teste 7: Exportar Dados", testar_exportacao()))
+    resultados.append(("Teste 8: Analise de Leiloes", testar_analise_leiloes()))
+    resultados.append(("Teste 9: Limite de Taxa", testar_limite_taxa()))
+    resultados.append(("Teste 10: Fila entre Processos", testar_fila_entre_processos()))
+    resultados.append(("Teste 11: Modo Quente", testar_modo_quente()))
     
     # Exibe resumo final
     print("\n" + "="*70)